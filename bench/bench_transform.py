@@ -0,0 +1,116 @@
+'''Benchmarks rsa.transform.int2bytes() and bytes2int().
+
+They are compared with the conversions rsa.transform used before:
+int2bytes() packed the number one machine word at a time and stripped the
+leading zero bytes afterwards, and bytes2int() always went through a hex
+string. The results of both are checked to be the same first, including
+the fill_size, chunk_size and overflow handling.
+
+Run from the repository root: ``python bench/bench_transform.py``
+'''
+
+import binascii
+import os
+import random
+import sys
+import timeit
+from struct import pack
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rsa import transform
+from rsa._compat import get_word_alignment, ZERO_BYTE
+
+
+def old_int2bytes(number, fill_size=None, chunk_size=None, overflow=False):
+    '''int2bytes() as it was, packing one machine word at a time.'''
+
+    if number < 0:
+        raise ValueError("Number must be an unsigned integer: %d" % number)
+
+    if fill_size and chunk_size:
+        raise ValueError("You can either fill or pad chunks, but not both")
+
+    raw_bytes = ZERO_BYTE[:0]
+    num = number
+    word_bits, _, max_uint, pack_type = get_word_alignment(num)
+    pack_format = ">%s" % pack_type
+    while num > 0:
+        raw_bytes = pack(pack_format, num & max_uint) + raw_bytes
+        num >>= word_bits
+    zero_leading = transform.bytes_leading(raw_bytes)
+    if number == 0:
+        raw_bytes = ZERO_BYTE
+    raw_bytes = raw_bytes[zero_leading:]
+
+    length = len(raw_bytes)
+    if fill_size and fill_size > 0:
+        if not overflow and length > fill_size:
+            raise OverflowError(
+                "Need %d bytes for number, but fill size is %d" %
+                (length, fill_size)
+            )
+        raw_bytes = raw_bytes.rjust(fill_size, ZERO_BYTE)
+    elif chunk_size and chunk_size > 0:
+        remainder = length % chunk_size
+        if remainder:
+            padding_size = chunk_size - remainder
+            raw_bytes = raw_bytes.rjust(length + padding_size, ZERO_BYTE)
+    return raw_bytes
+
+
+def old_bytes2int(raw_bytes):
+    '''bytes2int() as it was, through a hex string.'''
+
+    return int(binascii.hexlify(raw_bytes), 16)
+
+
+def outcome(function, *args, **kwargs):
+    try:
+        return function(*args, **kwargs)
+    except (OverflowError, ValueError) as exc:
+        return type(exc)
+
+
+def check(rounds=2000):
+    rng = random.Random(27)
+    numbers = [0, 1, 255, 256, 2 ** 64 - 1, 2 ** 64]
+    numbers += [rng.getrandbits(rng.randrange(1, 4100)) for _ in range(rounds)]
+    for number in numbers:
+        for kwargs in ({}, {'fill_size': 256}, {'fill_size': 3},
+                       {'fill_size': 3, 'overflow': True},
+                       {'chunk_size': 7}, {'chunk_size': 256}):
+            expected = outcome(old_int2bytes, number, **kwargs)
+            actual = outcome(transform.int2bytes, number, **kwargs)
+            assert actual == expected, (number, kwargs, actual, expected)
+        raw = old_int2bytes(number, 520)
+        assert transform.bytes2int(raw) == old_bytes2int(raw) == number, number
+    assert outcome(transform.bytes2int, raw[:0]) is ValueError
+
+
+def best(function, number):
+    return min(timeit.repeat(function, number=number, repeat=5))
+
+
+def main():
+    check()
+    print('int2bytes() and bytes2int() match the old conversion.')
+
+    rounds = 20000
+    for bits in (1024, 2048, 4096):
+        number = random.Random(bits).getrandbits(bits) | (1 << (bits - 1))
+        block = bits // 8
+        raw = transform.int2bytes(number, block)
+        old = best(lambda: old_int2bytes(number, block), rounds)
+        new = best(lambda: transform.int2bytes(number, block), rounds)
+        old_parse = best(lambda: old_bytes2int(raw), rounds)
+        parse = best(lambda: transform.bytes2int(raw), rounds)
+        print('%i-bit numbers, %i calls:' % (bits, rounds))
+        print('    int2bytes, old: %.3f s' % old)
+        print('    int2bytes, new: %.3f s' % new)
+        print('    bytes2int, old: %.3f s' % old_parse)
+        print('    bytes2int, new: %.3f s' % parse)
+
+
+if __name__ == '__main__':
+    main()
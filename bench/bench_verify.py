@@ -0,0 +1,62 @@
+'''Benchmarks rsa.pkcs1.verify_batch() against calling rsa.verify() for
+every signature.
+
+A set of signatures made with one key is verified both ways, after
+checking that both give the same verdict for each signature, including
+signatures that don't match their message.
+
+Run from the repository root: ``python bench/bench_verify.py``
+'''
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import rsa
+from rsa import pkcs1
+from rsa.pkcs1 import verify_batch
+
+
+def verify_each(signed, pub_key):
+    results = []
+    for (message, signature) in signed:
+        try:
+            results.append(rsa.verify(message, signature, pub_key))
+        except pkcs1.VerificationError:
+            results.append(False)
+    return results
+
+
+def make_signed(priv_key, count):
+    signed = []
+    for i in range(count):
+        message = ('requirement %i' % i).encode('ascii')
+        signature = rsa.sign(message, priv_key, 'SHA-1')
+        if i % 10 == 9:
+            message += b'!'
+        signed.append((message, signature))
+    return signed
+
+
+def main():
+    count = 500
+    for bits in (1024, 2048):
+        (pub_key, priv_key) = rsa.newkeys(bits)
+        signed = make_signed(priv_key, count)
+        assert verify_batch(signed, pub_key) == verify_each(signed, pub_key)
+
+        each = min(timeit.repeat(lambda: verify_each(signed, pub_key),
+                                 number=1, repeat=5))
+        batch = min(timeit.repeat(lambda: verify_batch(signed, pub_key),
+                                  number=1, repeat=5))
+        print('%i signatures, %i-bit key:' % (count, bits))
+        print('    rsa.verify() each: %.1f ms (%.1f us per signature)'
+              % (each * 1e3, each * 1e6 / count))
+        print('    verify_batch():    %.1f ms (%.1f us per signature)'
+              % (batch * 1e3, batch * 1e6 / count))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,22 @@
 # BER decoder
 from pyasn1.type import tag, base, univ, char, useful, tagmap
 from pyasn1.codec.ber import eoo
-from pyasn1.compat.octets import oct2int, octs2ints, isOctetsType
+from pyasn1.compat.octets import oct2int, octs2ints, ints2octs, isOctetsType, null
 from pyasn1 import debug, error
 
+# Substrate may be given as a memoryview, in which case slicing it while
+# walking down the TLV structure does not copy any octets. Only leaf values
+# are turned into octets, with octsOf().
+try:
+    viewTypes = (memoryview,)
+except NameError:
+    viewTypes = ()
+
+def octsOf(substrate):
+    if isinstance(substrate, viewTypes):
+        return substrate.tobytes()
+    return substrate
+
 class AbstractDecoder:
     protoComponent = None
     def valueDecoder(self, fullSubstrate, substrate, asn1Spec, tagSet,
@@ -16,13 +29,21 @@ class AbstractDecoder:
 
 class AbstractSimpleDecoder(AbstractDecoder):
     tagFormats = (tag.tagFormatSimple,)
+    # Set where decoded values are known to meet protoComponent constraints
+    # so these are not verified again, unless asn1Spec adds its own
+    constraintsChecked = False
     def _createComponent(self, asn1Spec, tagSet, value=None):
         if tagSet[0][1] not in self.tagFormats:
             raise error.PyAsn1Error('Invalid tag format %r for %r' % (tagSet[0], self.protoComponent,))
         if asn1Spec is None:
+            if self.constraintsChecked and value is not None:
+                return self.protoComponent.cloneVerified(value, tagSet)
             return self.protoComponent.clone(value, tagSet)
         elif value is None:
             return asn1Spec
+        elif self.constraintsChecked and asn1Spec.getSubtypeSpec() is \
+                 self.protoComponent.getSubtypeSpec():
+            return asn1Spec.cloneVerified(value)
         else:
             return asn1Spec.clone(value)
         
@@ -94,7 +115,7 @@ class IntegerDecoder(AbstractSimpleDecoder):
     
     def valueDecoder(self, fullSubstrate, substrate, asn1Spec, tagSet, length,
                      state, decodeFun, substrateFun):
-        head, tail = substrate[:length], substrate[length:]
+        head, tail = octsOf(substrate[:length]), substrate[length:]
         if not head:
             return self._createComponent(asn1Spec, tagSet, 0), tail
         if head in self.precomputedValues:
@@ -111,6 +132,7 @@ class IntegerDecoder(AbstractSimpleDecoder):
 
 class BooleanDecoder(IntegerDecoder):
     protoComponent = univ.Boolean(0)
+    constraintsChecked = True
     def _createComponent(self, asn1Spec, tagSet, value=None):
         return IntegerDecoder._createComponent(self, asn1Spec, tagSet, value and 1 or 0)
 
@@ -123,6 +145,7 @@ class BitStringDecoder(AbstractSimpleDecoder):
         if tagSet[0][1] == tag.tagFormatSimple:    # XXX what tag to check?
             if not head:
                 raise error.PyAsn1Error('Empty substrate')
+            head = octsOf(head)
             trailingBits = oct2int(head[0])
             if trailingBits > 7:
                 raise error.PyAsn1Error(
@@ -172,7 +195,7 @@ class OctetStringDecoder(AbstractSimpleDecoder):
                      state, decodeFun, substrateFun):
         head, tail = substrate[:length], substrate[length:]
         if tagSet[0][1] == tag.tagFormatSimple:    # XXX what tag to check?
-            return self._createComponent(asn1Spec, tagSet, head), tail
+            return self._createComponent(asn1Spec, tagSet, octsOf(head)), tail
         r = self._createComponent(asn1Spec, tagSet, '')
         if substrateFun:
             return substrateFun(r, substrate, length)
@@ -212,7 +235,7 @@ class ObjectIdentifierDecoder(AbstractSimpleDecoder):
     protoComponent = univ.ObjectIdentifier(())
     def valueDecoder(self, fullSubstrate, substrate, asn1Spec, tagSet, length,
                      state, decodeFun, substrateFun):
-        head, tail = substrate[:length], substrate[length:]
+        head, tail = octsOf(substrate[:length]), substrate[length:]
         if not head:
             raise error.PyAsn1Error('Empty substrate')
 
@@ -250,7 +273,7 @@ class RealDecoder(AbstractSimpleDecoder):
     protoComponent = univ.Real()
     def valueDecoder(self, fullSubstrate, substrate, asn1Spec, tagSet,
                      length, state, decodeFun, substrateFun):
-        head, tail = substrate[:length], substrate[length:]
+        head, tail = octsOf(substrate[:length]), substrate[length:]
         if not head:
             return self._createComponent(asn1Spec, tagSet, 0.0), tail
         fo = oct2int(head[0]); head = head[1:]
@@ -465,7 +488,7 @@ class AnyDecoder(AbstractSimpleDecoder):
         if substrateFun:
             return substrateFun(self._createComponent(asn1Spec, tagSet),
                                 substrate, length)
-        head, tail = substrate[:length], substrate[length:]
+        head, tail = octsOf(substrate[:length]), substrate[length:]
         return self._createComponent(asn1Spec, tagSet, value=head), tail
 
     def indefLenValueDecoder(self, fullSubstrate, substrate, asn1Spec, tagSet,
@@ -475,7 +498,7 @@ class AnyDecoder(AbstractSimpleDecoder):
             header = ''
         else:
             # untagged Any, recover header substrate
-            header = fullSubstrate[:-len(substrate)]
+            header = octsOf(fullSubstrate[:-len(substrate)])
 
         r = self._createComponent(asn1Spec, tagSet, header)
 
@@ -596,6 +619,7 @@ class Decoder:
                         'Short octet stream on tag decoding'
                         )
                 if not isOctetsType(substrate) and \
+                   not isinstance(substrate, viewTypes) and \
                    not isinstance(substrate, univ.OctetString):
                     raise error.PyAsn1Error('Bad octet stream type')
                 
@@ -694,18 +718,11 @@ class Decoder:
             # from the wire.
             #            
             if state == stGetValueDecoderByTag:
-                if tagSet in self.__tagMap:
-                    concreteDecoder = self.__tagMap[tagSet]
-                else:
-                    concreteDecoder = None
+                concreteDecoder = self.__tagMap.get(tagSet)
                 if concreteDecoder:
                     state = stDecodeValue
                 else:
-                    _k = tagSet[:1]
-                    if _k in self.__tagMap:
-                        concreteDecoder = self.__tagMap[_k]
-                    else:
-                        concreteDecoder = None
+                    concreteDecoder = self.__tagMap.get(tagSet[:1])
                     if concreteDecoder:
                         state = stDecodeValue
                     else:
@@ -804,5 +821,104 @@ class Decoder:
             
 decode = Decoder(tagMap, typeMap)
 
+# Pull-style decoding of file-like objects. TLVs are read from the stream
+# one at a time, so only one top-level object (or, with
+# decodeStreamComponents(), one component) is held in memory at once.
+
+eooOcts = ints2octs((0, 0))
+
+def readOcts(stream, size):
+    octs = stream.read(size)
+    if len(octs) != size:
+        raise error.SubstrateUnderrunError(
+            '%d-octet short' % (size - len(octs))
+            )
+    return octs
+
+def readHeader(stream):
+    # Returns (header octets, value length), value length being -1 for
+    # indefinite length encoding, or (null, None) at end of stream
+    header = stream.read(1)
+    if not header:
+        return null, None
+    if oct2int(header[0]) & 0x1F == 0x1F:
+        # long tag
+        while 1:
+            octet = readOcts(stream, 1)
+            header = header + octet
+            if not oct2int(octet[0]) & 0x80:
+                break
+    octet = readOcts(stream, 1)
+    header = header + octet
+    firstOctet = oct2int(octet[0])
+    if firstOctet == 128:
+        return header, -1
+    elif firstOctet < 128:
+        return header, firstOctet
+    lengthString = readOcts(stream, firstOctet & 0x7F)
+    length = 0
+    for octet in octs2ints(lengthString):
+        length = (length << 8) | octet
+    return header + lengthString, length
+
+def readTlv(stream):
+    # Returns the octets of the next complete TLV, or null at end of stream
+    header, length = readHeader(stream)
+    if length is None:
+        return null
+    if length != -1:
+        return header + readOcts(stream, length)
+    chunks = [ header ]
+    while 1:
+        chunk = readTlv(stream)
+        if not chunk:
+            raise error.SubstrateUnderrunError(
+                'No EOO seen before end of stream'
+                )
+        chunks.append(chunk)
+        if chunk == eooOcts:
+            return null.join(chunks)
+
+def decodeStream(stream, asn1Spec=None, decodeFun=decode):
+    # Yields each top-level object read from the stream
+    while 1:
+        substrate = readTlv(stream)
+        if not substrate:
+            break
+        value, _ = decodeFun(substrate, asn1Spec)
+        yield value
+
+def decodeStreamComponents(stream, asn1Spec=None, decodeFun=decode):
+    # Yields each component of the constructed (typically SEQUENCE OF)
+    # object at the head of the stream, without reading it in as a whole.
+    # Only SEQUENCE OF and SET OF specs describe their components by one
+    # type; SequenceOf derives from SetOf
+    if asn1Spec is not None and not isinstance(asn1Spec, univ.SetOf):
+        raise error.PyAsn1Error(
+            'SEQUENCE OF or SET OF spec expected, not %r' % (asn1Spec,)
+            )
+    header, length = readHeader(stream)
+    if length is None:
+        raise error.SubstrateUnderrunError('Short octet stream on tag decoding')
+    if not oct2int(header[0]) & 0x20:
+        raise error.PyAsn1Error('Constructed encoding expected')
+    if asn1Spec is not None:
+        asn1Spec = asn1Spec.getComponentType()
+    while length:
+        substrate = readTlv(stream)
+        if not substrate:
+            raise error.SubstrateUnderrunError(
+                'Short octet stream on component decoding'
+                )
+        if length == -1:
+            if substrate == eooOcts:
+                break
+        else:
+            length = length - len(substrate)
+            if length < 0:
+                raise error.PyAsn1Error('Component overruns constructed value')
+        value, _ = decodeFun(substrate, asn1Spec)
+        yield value
+
 # XXX
 # non-recursive decoding; return position rather than substrate
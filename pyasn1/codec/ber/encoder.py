@@ -3,25 +3,14 @@ from pyasn1.type import base, tag, univ, char, useful
 from pyasn1.codec.ber import eoo
 from pyasn1.compat.octets import int2oct, oct2int, ints2octs, null, str2octs
 from pyasn1 import debug, error
+from binascii import unhexlify
 
 class Error(Exception): pass
 
 class AbstractItemEncoder:
     supportIndefLenMode = 1
     def encodeTag(self, t, isConstructed):
-        tagClass, tagFormat, tagId = t.asTuple()  # this is a hotspot
-        v = tagClass | tagFormat
-        if isConstructed:
-            v = v|tag.tagFormatConstructed
-        if tagId < 31:
-            return int2oct(v|tagId)
-        else:
-            s = int2oct(tagId&0x7f)
-            tagId = tagId >> 7
-            while tagId:
-                s = int2oct(0x80|(tagId&0x7f)) + s
-                tagId = tagId >> 7
-            return int2oct(v|0x1F) + s
+        return t.asOctets(isConstructed)  # this is a hotspot
 
     def encodeLength(self, length, defMode):
         if not defMode and self.supportIndefLenMode:
@@ -29,14 +18,16 @@ class AbstractItemEncoder:
         if length < 0x80:
             return int2oct(length)
         else:
-            substrate = null
+            octets = []
             while length:
-                substrate = int2oct(length&0xff) + substrate
+                octets.append(length&0xff)
                 length = length >> 8
-            substrateLen = len(substrate)
+            substrateLen = len(octets)
             if substrateLen > 126:
                 raise Error('Length octets overflow (%d)' % substrateLen)
-            return int2oct(0x80 | substrateLen) + substrate
+            octets.append(0x80 | substrateLen)
+            octets.reverse()
+            return ints2octs(octets)
 
     def encodeValue(self, encodeFun, value, defMode, maxChunkSize):
         raise Error('Not implemented')
@@ -55,11 +46,13 @@ class AbstractItemEncoder:
         if tagSet:
             if not isConstructed:  # primitive form implies definite mode
                 defMode = 1
-            return self.encodeTag(
-                tagSet[-1], isConstructed
-                ) + self.encodeLength(
-                len(substrate), defMode
-                ) + substrate + self._encodeEndOfOctets(encodeFun, defMode)
+            # join once rather than re-copying substrate on every addition
+            return null.join((
+                self.encodeTag(tagSet[-1], isConstructed),
+                self.encodeLength(len(substrate), defMode),
+                substrate,
+                self._encodeEndOfOctets(encodeFun, defMode)
+                ))
         else:
             return substrate  # untagged value
 
@@ -96,20 +89,14 @@ class IntegerEncoder(AbstractItemEncoder):
             else:
                 # this seems to be a widespread way for encoding zeros
                 return ints2octs((0,)), 0
-        octets = []
         value = int(value) # to save on ops on asn1 type
-        while 1:
-            octets.insert(0, value & 0xff)
-            if value == 0 or value == -1:
-                break
-            value = value >> 8
-        if value == 0 and octets[0] & 0x80:
-            octets.insert(0, 0)
-        while len(octets) > 1 and \
-                  (octets[0] == 0 and octets[1] & 0x80 == 0 or \
-                   octets[0] == 0xff and octets[1] & 0x80 != 0):
-            del octets[0]
-        return ints2octs(octets), 0
+        # shortest two's complement form that still has room for the sign bit
+        if value > 0:
+            size = value.bit_length() // 8 + 1
+        else:
+            size = (-value - 1).bit_length() // 8 + 1
+        value = value & ((1 << (size * 8)) - 1)
+        return unhexlify(str2octs('%0*x' % (size * 2, value))), 0
 
 class BitStringEncoder(AbstractItemEncoder):
     def encodeValue(self, encodeFun, value, defMode, maxChunkSize):
@@ -122,29 +109,29 @@ class BitStringEncoder(AbstractItemEncoder):
             keys = list(r); keys.sort()
             return int2oct(7-j) + ints2octs([r[k] for k in keys]), 0
         else:
-            pos = 0; substrate = null
+            pos = 0; chunks = []
             while 1:
                 # count in octets
                 v = value.clone(value[pos*8:pos*8+maxChunkSize*8])
                 if not v:
                     break
-                substrate = substrate + encodeFun(v, defMode, maxChunkSize)
+                chunks.append(encodeFun(v, defMode, maxChunkSize))
                 pos = pos + maxChunkSize
-            return substrate, 1
+            return null.join(chunks), 1
 
 class OctetStringEncoder(AbstractItemEncoder):
     def encodeValue(self, encodeFun, value, defMode, maxChunkSize):
         if not maxChunkSize or len(value) <= maxChunkSize:
             return value.asOctets(), 0
         else:
-            pos = 0; substrate = null
+            pos = 0; chunks = []
             while 1:
                 v = value.clone(value[pos:pos+maxChunkSize])
                 if not v:
                     break
-                substrate = substrate + encodeFun(v, defMode, maxChunkSize)
+                chunks.append(encodeFun(v, defMode, maxChunkSize))
                 pos = pos + maxChunkSize
-            return substrate, 1
+            return null.join(chunks), 1
 
 class NullEncoder(AbstractItemEncoder):
     supportIndefLenMode = 0
@@ -249,29 +236,23 @@ class SequenceEncoder(AbstractItemEncoder):
     def encodeValue(self, encodeFun, value, defMode, maxChunkSize):
         value.setDefaultComponents()
         value.verifySizeSpec()
-        substrate = null; idx = len(value)
-        while idx > 0:
-            idx = idx - 1
+        chunks = []
+        for idx in range(len(value)):
             if value[idx] is None:  # Optional component
                 continue
             component = value.getDefaultComponentByPosition(idx)
             if component is not None and component == value[idx]:
                 continue
-            substrate = encodeFun(
-                value[idx], defMode, maxChunkSize
-                ) + substrate
-        return substrate, 1
+            chunks.append(encodeFun(value[idx], defMode, maxChunkSize))
+        return null.join(chunks), 1
 
 class SequenceOfEncoder(AbstractItemEncoder):
     def encodeValue(self, encodeFun, value, defMode, maxChunkSize):
         value.verifySizeSpec()
-        substrate = null; idx = len(value)
-        while idx > 0:
-            idx = idx - 1
-            substrate = encodeFun(
-                value[idx], defMode, maxChunkSize
-                ) + substrate
-        return substrate, 1
+        chunks = []
+        for idx in range(len(value)):
+            chunks.append(encodeFun(value[idx], defMode, maxChunkSize))
+        return null.join(chunks), 1
 
 class ChoiceEncoder(AbstractItemEncoder):
     def encodeValue(self, encodeFun, value, defMode, maxChunkSize):
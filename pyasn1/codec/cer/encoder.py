@@ -33,7 +33,7 @@ class SetOfEncoder(encoder.SequenceOfEncoder):
         if isinstance(client, univ.SequenceAndSetBase):
             client.setDefaultComponents()
         client.verifySizeSpec()
-        substrate = null; idx = len(client)
+        idx = len(client)
         # This is certainly a hack but how else do I distinguish SetOf
         # from Set if they have the same tags&constraints?
         if isinstance(client, univ.SequenceAndSetBase):
@@ -48,8 +48,9 @@ class SetOfEncoder(encoder.SequenceOfEncoder):
                 comps.append(client[idx])
             comps.sort(key=lambda x: isinstance(x, univ.Choice) and \
                                      x.getMinTagSet() or x.getTagSet())
-            for c in comps:
-                substrate += encodeFun(c, defMode, maxChunkSize)
+            substrate = null.join(
+                [ encodeFun(c, defMode, maxChunkSize) for c in comps ]
+                )
         else:
             # SetOf
             compSubs = []
@@ -59,9 +60,7 @@ class SetOfEncoder(encoder.SequenceOfEncoder):
                     encodeFun(client[idx], defMode, maxChunkSize)
                     )
             compSubs.sort()  # perhaps padding's not needed
-            substrate = null
-            for compSub in compSubs:
-                substrate += compSub
+            substrate = null.join(compSubs)
         return substrate, 1
 
 tagMap = encoder.tagMap.copy()
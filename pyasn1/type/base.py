@@ -3,9 +3,12 @@ import sys
 from pyasn1.type import constraint, tagmap
 from pyasn1 import error
 
-class Asn1Item: pass
+class Asn1Item(object):
+    __slots__ = ()
 
 class Asn1ItemBase(Asn1Item):
+    __slots__ = ('_tagSet', '_subtypeSpec')
+
     # Set of tags for this ASN.1 type
     tagSet = ()
     
@@ -47,16 +50,37 @@ class Asn1ItemBase(Asn1Item):
         return self._tagSet.isSuperTagSetOf(other.getTagSet()) and \
                self._subtypeSpec.isSuperTypeOf(other.getSubtypeSpec())
 
+    # Slotted instances have no __dict__ to pickle, so their state is
+    # gathered from the slots of every class in the hierarchy
+    def __getstate__(self):
+        state = {}
+        for cls in self.__class__.__mro__:
+            for name in cls.__dict__.get('__slots__', ()):
+                if name.startswith('__'):
+                    name = '_%s%s' % (cls.__name__.lstrip('_'), name)
+                if hasattr(self, name):
+                    state[name] = getattr(self, name)
+        state.update(getattr(self, '__dict__', {}))
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
 class __NoValue:
     def __getattr__(self, attr):
         raise error.PyAsn1Error('No value for %s()' % attr)
     def __getitem__(self, i):
         raise error.PyAsn1Error('No value')
+    # Copies of values must still hold the noValue singleton
+    def __copy__(self): return self
+    def __deepcopy__(self, memo): return self
     
 noValue = __NoValue()
 
 # Base class for "simple" ASN.1 objects. These are immutable.
 class AbstractSimpleAsn1Item(Asn1ItemBase):    
+    __slots__ = ('_value', '_len', '__hashedValue')
     defaultValue = noValue
     def __init__(self, value=None, tagSet=None, subtypeSpec=None):
         Asn1ItemBase.__init__(self, tagSet, subtypeSpec)
@@ -90,6 +114,12 @@ class AbstractSimpleAsn1Item(Asn1ItemBase):
         def __bool__(self): return bool(self._value)
     def __hash__(self): return self.__hashedValue
 
+    def __setstate__(self, state):
+        Asn1ItemBase.__setstate__(self, state)
+        # String hashes need not survive the trip to another process
+        if self._value is not noValue:
+            self.__hashedValue = hash(self._value)
+
     def clone(self, value=None, tagSet=None, subtypeSpec=None):
         if value is None and tagSet is None and subtypeSpec is None:
             return self
@@ -101,6 +131,36 @@ class AbstractSimpleAsn1Item(Asn1ItemBase):
             subtypeSpec = self._subtypeSpec
         return self.__class__(value, tagSet, subtypeSpec)
 
+    # Fast clone() path for subclasses: same type attributes (except,
+    # perhaps, tags) and a value already coerced by prettyIn(). Constraints
+    # are only checked if asked for and there are any.
+    def _cloneValue(self, value, tagSet=None, verifyConstraints=True):
+        r = self.__class__.__new__(self.__class__)
+        if tagSet is None:
+            r._tagSet = self._tagSet
+        else:
+            r._tagSet = tagSet
+        r._subtypeSpec = self._subtypeSpec
+        if value is noValue:
+            r.__hashedValue = noValue
+        else:
+            if verifyConstraints and r._subtypeSpec:
+                r._verifySubtypeSpec(value)
+            r.__hashedValue = hash(value)
+        r._value = value
+        r._len = None
+        self._cloneTypeAttrs(r)
+        return r
+
+    # Clone holding a value of prettyIn() type and known to meet our
+    # constraints, e.g. one range-checked by a decoder
+    def cloneVerified(self, value, tagSet=None):
+        return self._cloneValue(value, tagSet, False)
+
+    def _cloneTypeAttrs(self, myClone):
+        if hasattr(self, '__dict__'):
+            myClone.__dict__.update(self.__dict__)
+
     def subtype(self, value=None, implicitTag=None, explicitTag=None,
                 subtypeSpec=None):
         if value is None:
@@ -11,9 +11,68 @@
 #
 #   Original concept and code by Mike C. Fletcher.
 #
+#   Each constraint is also compiled, on first use, into a predicate
+#   function of (value, idx) returning a boolean. Nested intersections
+#   are flattened into a single list of tests and constraints that can't
+#   fail drop out. The constraint tree is only walked again, to build
+#   the error message, if a value is rejected.
+#
+#   Constraint sets built by adding constraints together are interned,
+#   so types sharing the same constraints share one compiled predicate.
+#
 import sys
 from pyasn1.type import error
 
+def alwaysTrue(value, idx): return True
+
+def predicateOf(constraint):
+    if isinstance(constraint, AbstractConstraint):
+        return constraint.getPredicate()
+    def predicate(value, idx):
+        try:
+            constraint(value, idx)
+        except error.ValueConstraintError:
+            return False
+        return True
+    return predicate
+
+def conjunctsOf(constraints):
+    r = []
+    for c in constraints:
+        if isinstance(c, AbstractConstraint):
+            r.extend(c._getConjuncts())
+        else:
+            r.append(predicateOf(c))
+    return r
+
+def allOf(predicates):
+    predicates = [ p for p in predicates if p is not alwaysTrue ]
+    if not predicates:
+        return alwaysTrue
+    if len(predicates) == 1:
+        return predicates[0]
+    def predicate(value, idx):
+        for p in predicates:
+            if not p(value, idx):
+                return False
+        return True
+    return predicate
+
+internLimit = 4096
+_internedConstraints = {}
+
+def internConstraint(constraint):
+    try:
+        key = constraint.getInternKey()
+    except TypeError:  # unhashable values
+        return constraint
+    try:
+        return _internedConstraints[key]
+    except KeyError:
+        if len(_internedConstraints) < internLimit:
+            _internedConstraints[key] = constraint
+        return constraint
+
 class AbstractConstraint:
     """Abstract base-class for constraint objects
 
@@ -24,7 +83,10 @@ class AbstractConstraint:
         self._valueMap = {}
         self._setValues(values)
         self.__hashedValues = None
+        self.__predicate = None
     def __call__(self, value, idx=None):
+        if self.getPredicate()(value, idx):
+            return
         try:
             self._testValue(value, idx)
         except error.ValueConstraintError:
@@ -57,6 +119,45 @@ class AbstractConstraint:
     def _testValue(self, value, idx):
         raise error.ValueConstraintError(value)
 
+    # The compiled predicate is a closure, which can't be pickled; it is
+    # compiled again on first use
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_AbstractConstraint__predicate'] = None
+        return state
+
+    # Compiled form
+
+    def getPredicate(self):
+        if self.__predicate is None:
+            self.__predicate = self._compile()
+        return self.__predicate
+
+    def _compile(self):
+        testValue = self._testValue
+        def predicate(value, idx):
+            try:
+                testValue(value, idx)
+            except error.ValueConstraintError:
+                return False
+            return True
+        return predicate
+
+    # Predicates to be and-ed together in place of this constraint
+    def _getConjuncts(self): return [ self.getPredicate() ]
+
+    def getInternKey(self):
+        # Values carry their type, as 0, 0.0 and False compare equal
+        key = [ self.__class__ ]
+        for v in self._values:
+            if isinstance(v, AbstractConstraint):
+                key.append(v.getInternKey())
+            else:
+                key.append((type(v), v))
+        key = tuple(key)
+        hash(key)
+        return key
+
     # Constraints derivation logic
     def getValueMap(self): return self._valueMap
     def isSuperTypeOf(self, otherConstraint):
@@ -73,12 +174,29 @@ class SingleValueConstraint(AbstractConstraint):
         if value not in self._values:
             raise error.ValueConstraintError(value)
 
+    def _compile(self):
+        allValues = self._values
+        try:
+            values = frozenset(allValues)
+        except TypeError:
+            values = allValues
+        def predicate(value, idx):
+            try:
+                return value in values
+            except TypeError:
+                return value in allValues
+        return predicate
+
 class ContainedSubtypeConstraint(AbstractConstraint):
     """Value must satisfy all of defined set of constraints"""
     def _testValue(self, value, idx):
         for c in self._values:
             c(value, idx)
 
+    def _getConjuncts(self): return conjunctsOf(self._values)
+
+    def _compile(self): return allOf(self._getConjuncts())
+
 class ValueRangeConstraint(AbstractConstraint):
     """Value must be within start and stop values (inclusive)"""
     def _testValue(self, value, idx):
@@ -99,6 +217,10 @@ class ValueRangeConstraint(AbstractConstraint):
                 )
             )
         AbstractConstraint._setValues(self, values)
+
+    def _compile(self):
+        start, stop = self.start, self.stop
+        return lambda value, idx: start <= value <= stop
         
 class ValueSizeConstraint(ValueRangeConstraint):
     """len(value) must be within start and stop values (inclusive)"""
@@ -107,6 +229,10 @@ class ValueSizeConstraint(ValueRangeConstraint):
         if l < self.start or l > self.stop:
             raise error.ValueConstraintError(value)
 
+    def _compile(self):
+        start, stop = self.start, self.stop
+        return lambda value, idx: start <= len(value) <= stop
+
 class PermittedAlphabetConstraint(SingleValueConstraint):
     def _setValues(self, values):
         self._values = ()
@@ -118,6 +244,10 @@ class PermittedAlphabetConstraint(SingleValueConstraint):
             if v not in self._values:
                 raise error.ValueConstraintError(value)
 
+    def _compile(self):
+        alphabet = frozenset(self._values)
+        return lambda value, idx: alphabet.issuperset(value)
+
 # This is a bit kludgy, meaning two op modes within a single constraing
 class InnerTypeConstraint(AbstractConstraint):
     """Value must satisfy type and presense constraints"""
@@ -159,12 +289,18 @@ class ConstraintsExclusion(AbstractConstraint):
             raise error.PyAsn1Error('Single constraint expected')
         AbstractConstraint._setValues(self, values)
 
+    def _compile(self):
+        excluded = predicateOf(self._values[0])
+        return lambda value, idx: not excluded(value, idx)
+
 class AbstractConstraintSet(AbstractConstraint):
     """Value must not satisfy the single constraint"""
     def __getitem__(self, idx): return self._values[idx]
 
-    def __add__(self, value): return self.__class__(self, value)
-    def __radd__(self, value): return self.__class__(self, value)
+    def __add__(self, value):
+        return internConstraint(self.__class__(self, value))
+    def __radd__(self, value):
+        return internConstraint(self.__class__(self, value))
 
     def __len__(self): return len(self._values)
 
@@ -182,6 +318,10 @@ class ConstraintsIntersection(AbstractConstraintSet):
         for v in self._values:
             v(value, idx)
 
+    def _getConjuncts(self): return conjunctsOf(self._values)
+
+    def _compile(self): return allOf(self._getConjuncts())
+
 class ConstraintsUnion(AbstractConstraintSet):
     """Value must satisfy at least one constraint"""
     def _testValue(self, value, idx):
@@ -196,5 +336,16 @@ class ConstraintsUnion(AbstractConstraintSet):
             'all of %s failed for \"%s\"' % (self._values, value)
             )
 
+    def _compile(self):
+        predicates = [ predicateOf(v) for v in self._values ]
+        if alwaysTrue in predicates:
+            return alwaysTrue
+        def predicate(value, idx):
+            for p in predicates:
+                if p(value, idx):
+                    return True
+            return False
+        return predicate
+
 # XXX
 # add tests for type check
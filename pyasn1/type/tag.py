@@ -1,5 +1,6 @@
 # ASN.1 types tags
 from operator import getitem
+from pyasn1.compat.octets import ints2octs
 from pyasn1 import error
 
 tagClassUniversal = 0x00
@@ -14,6 +15,19 @@ tagCategoryImplicit = 0x01
 tagCategoryExplicit = 0x02
 tagCategoryUntagged = 0x04
 
+def _tagOctets(tagClass, tagFormat, tagId):
+    # BER identifier octets
+    if tagId < 31:
+        return ints2octs((tagClass|tagFormat|tagId,))
+    octets = [tagId&0x7f]
+    tagId = tagId >> 7
+    while tagId:
+        octets.append(0x80|(tagId&0x7f))
+        tagId = tagId >> 7
+    octets.append(tagClass|tagFormat|0x1F)
+    octets.reverse()
+    return ints2octs(octets)
+
 class Tag:
     def __init__(self, tagClass, tagFormat, tagId):
         if tagId < 0:
@@ -23,6 +37,10 @@ class Tag:
         self.__tag = (tagClass, tagFormat, tagId)
         self.uniq = (tagClass, tagId)
         self.__hashedUniqTag = hash(self.uniq)
+        self.__octets = (
+            _tagOctets(tagClass, tagFormat, tagId),
+            _tagOctets(tagClass, tagFormat|tagFormatConstructed, tagId)
+            )
 
     def __repr__(self):
         return '%s(tagClass=%s, tagFormat=%s, tagId=%s)' % (
@@ -51,6 +69,9 @@ class Tag:
             self.__tag[2]|tagId
             )
     def asTuple(self): return self.__tag  # __getitem__() is slow
+    # BER identifier octets, optionally forced into constructed form
+    def asOctets(self, isConstructed=0):
+        return self.__octets[isConstructed and 1 or 0]
     
 class TagSet:
     def __init__(self, baseTag=(), *superTags):
@@ -11,9 +11,11 @@ class TagMap:
                self.__defType is not None and tagSet not in self.__negMap
 
     def __getitem__(self, tagSet):
-        if tagSet in self.__posMap:
+        try:
             return self.__posMap[tagSet]
-        elif tagSet in self.__negMap:
+        except KeyError:
+            pass
+        if tagSet in self.__negMap:
             raise error.PyAsn1Error('Key in negative map')
         elif self.__defType is not None:
             return self.__defType
@@ -5,12 +5,18 @@ from pyasn1.codec.ber import eoo
 from pyasn1.compat import octets
 from pyasn1 import error
 
+if sys.version_info[0] <= 2:
+    intTypes = (int, long)
+else:
+    intTypes = int
+
 # "Simple" ASN.1 types (yet incomplete)
 
 class Integer(base.AbstractSimpleAsn1Item):
     tagSet = baseTagSet = tag.initTagSet(
         tag.Tag(tag.tagClassUniversal, tag.tagFormatSimple, 0x02)
         )
+    __slots__ = ('__namedValues',)
     namedValues = namedval.NamedValues()
     def __init__(self, value=None, tagSet=None, subtypeSpec=None,
                  namedValues=None):
@@ -96,6 +102,11 @@ class Integer(base.AbstractSimpleAsn1Item):
         if value is None and tagSet is None and subtypeSpec is None \
                and namedValues is None:
             return self
+        if subtypeSpec is None and namedValues is None:
+            if value is None:
+                return self._cloneValue(self._value, tagSet, False)
+            if isinstance(value, intTypes) and not isinstance(value, bool):
+                return self._cloneValue(value, tagSet)
         if value is None:
             value = self._value
         if tagSet is None:
@@ -106,6 +117,10 @@ class Integer(base.AbstractSimpleAsn1Item):
             namedValues = self.__namedValues
         return self.__class__(value, tagSet, subtypeSpec, namedValues)
 
+    def _cloneTypeAttrs(self, myClone):
+        myClone.__namedValues = self.__namedValues
+        base.AbstractSimpleAsn1Item._cloneTypeAttrs(self, myClone)
+
     def subtype(self, value=None, implicitTag=None, explicitTag=None,
                 subtypeSpec=None, namedValues=None):
         if value is None:
@@ -127,6 +142,7 @@ class Integer(base.AbstractSimpleAsn1Item):
         return self.__class__(value, tagSet, subtypeSpec, namedValues)
 
 class Boolean(Integer):
+    __slots__ = ()
     tagSet = baseTagSet = tag.initTagSet(
         tag.Tag(tag.tagClassUniversal, tag.tagFormatSimple, 0x01),
         )
@@ -264,6 +280,7 @@ class OctetString(base.AbstractSimpleAsn1Item):
     tagSet = baseTagSet = tag.initTagSet(
         tag.Tag(tag.tagClassUniversal, tag.tagFormatSimple, 0x04)
         )
+    __slots__ = ('_encoding', '__intValue')
     defaultBinValue = defaultHexValue = base.noValue
     encoding = 'us-ascii'
     def __init__(self, value=None, tagSet=None, subtypeSpec=None,
@@ -288,6 +305,12 @@ class OctetString(base.AbstractSimpleAsn1Item):
         if value is None and tagSet is None and subtypeSpec is None and \
                encoding is None and binValue is None and hexValue is None:
             return self
+        if subtypeSpec is None and encoding is None and \
+               binValue is None and hexValue is None:
+            if value is None:
+                return self._cloneValue(self._value, tagSet, False)
+            if value.__class__ is bytes:
+                return self._cloneValue(value, tagSet)
         if value is None and binValue is None and hexValue is None:
             value = self._value
         if tagSet is None:
@@ -299,6 +322,11 @@ class OctetString(base.AbstractSimpleAsn1Item):
         return self.__class__(
             value, tagSet, subtypeSpec, encoding, binValue, hexValue
             )
+
+    def _cloneTypeAttrs(self, myClone):
+        myClone._encoding = self._encoding
+        myClone.__intValue = None
+        base.AbstractSimpleAsn1Item._cloneTypeAttrs(self, myClone)
    
     if sys.version_info[0] <= 2:
         def prettyIn(self, value):
@@ -421,16 +449,12 @@ class OctetString(base.AbstractSimpleAsn1Item):
     def __rmul__(self, value): return self * value
 
 class Null(OctetString):
+    __slots__ = ()
     defaultValue = ''.encode()  # This is tightly constrained
     tagSet = baseTagSet = tag.initTagSet(
         tag.Tag(tag.tagClassUniversal, tag.tagFormatSimple, 0x05)
         )
     subtypeSpec = OctetString.subtypeSpec+constraint.SingleValueConstraint(''.encode())
-    
-if sys.version_info[0] <= 2:
-    intTypes = (int, long)
-else:
-    intTypes = int
 
 class ObjectIdentifier(base.AbstractSimpleAsn1Item):
     tagSet = baseTagSet = tag.initTagSet(
@@ -624,6 +648,7 @@ class Real(base.AbstractSimpleAsn1Item):
             return self._value[idx]
     
 class Enumerated(Integer):
+    __slots__ = ()
     tagSet = baseTagSet = tag.initTagSet(
         tag.Tag(tag.tagClassUniversal, tag.tagFormatSimple, 0x0A)
         )
@@ -659,7 +684,7 @@ class SetOf(base.AbstractConstructedAsn1Item):
     def setComponentByPosition(self, idx, value=None, verifyConstraints=True):
         l = len(self._componentValues)
         if idx >= l:
-            self._componentValues = self._componentValues + (idx-l+1)*[None]
+            self._componentValues.extend((idx-l+1)*[None])
         if value is None:
             if self._componentValues[idx] is None:
                 if self._componentType is None:
@@ -770,7 +795,7 @@ class SequenceAndSetBase(base.AbstractConstructedAsn1Item):
     def setComponentByPosition(self, idx, value=None, verifyConstraints=True):
         l = len(self._componentValues)
         if idx >= l:
-            self._componentValues = self._componentValues + (idx-l+1)*[None]
+            self._componentValues.extend((idx-l+1)*[None])
         if value is None:
             if self._componentValues[idx] is None:
                 self._componentValues[idx] = self._componentType.getTypeByPosition(idx).clone()
@@ -961,7 +986,7 @@ class Choice(Set):
     def setComponentByPosition(self, idx, value=None, verifyConstraints=True):
         l = len(self._componentValues)
         if idx >= l:
-            self._componentValues = self._componentValues + (idx-l+1)*[None]
+            self._componentValues.extend((idx-l+1)*[None])
         if self._currentIdx is not None:
             self._componentValues[self._currentIdx] = None
         if value is None:
@@ -6,10 +6,13 @@ import pprint
 import copy
 import glob
 import textwrap
+import urllib
 import tracking
 
 _req_text_wrapper = textwrap.TextWrapper(width = 80, replace_whitespace = True, initial_indent = '    ', subsequent_indent = '    ', break_long_words = False)
 
+_bundle_version = 3
+
 def new_requirement(state, category, req_name, dependencies, text=None):
     '''
     Create a new requirement in the backlog.
@@ -42,8 +45,44 @@ def new_requirement(state, category, req_name, dependencies, text=None):
             f.write(_req_text_wrapper.fill(text))
             f.write("\n")
 
+def opens_document(source):
+    '''
+    Check whether a YAML source starts its document itself, with
+    directives or an explicit `---`, rather than with its content.
+    '''
+    tokens = yaml.scan(source)
+    next(tokens) # STREAM-START
+    return isinstance(next(tokens), (yaml.DirectiveToken, yaml.DocumentStartToken))
+
+def document_end(source):
+    '''
+    Get the `...` line that ends a requirement's document in a bundle.
+    '''
+    if source.endswith('\n'):
+        return "...\n"
+    return "\n...\n"
+
+def quote_field(value):
+    '''
+    Quote a name for a space separated line of a bundle's index.
+    '''
+    if isinstance(value, unicode):
+        value = value.encode('utf-8')
+    return urllib.quote(value, safe='')
+
+def unquote_field(text):
+    '''
+    Undo quote_field, giving a str when it is ASCII like the YAML loader.
+    '''
+    value = urllib.unquote(str(text))
+    try:
+        value.decode('ascii')
+    except UnicodeDecodeError:
+        value = value.decode('utf-8')
+    return value
+
 class Requirement(object):
-    def __init__(self, name, text, category, deps, filename, backlog):
+    def __init__(self, name, text, category, deps, filename, backlog, source=None, signatures=None):
         self.name = name
         self.text = text
         self._category = category
@@ -51,6 +90,10 @@ class Requirement(object):
         self.deps = deps
         self.file = filename
         
+        # the file contents and signatures, when loaded from a bundle
+        self.source = source
+        self.signatures = signatures
+        
         self.incoming = []
         self.transient = 0
     
@@ -117,6 +160,7 @@ class ProjectState(object):
         self.path = {}
         self.backlog = backlog
         self.root = ""
+        self.pubkeys = None
     
     def add_to_path(self, dirname):
         '''
@@ -132,20 +176,25 @@ class ProjectState(object):
         '''
         yml = None
         with open(filename, 'r') as f:
-            yml = yaml.load(f.read())
+            yml = yaml.extract(f.read(), ('text', 'deps'))
         if not yml:
             return #throw exception
         
         name = os.path.basename(filename)[:-2]
         category = os.path.split(os.path.dirname(filename))[1]
-        
+        self.add_requirement(name, category, yml, filename, self.backlog)
+    
+    def add_requirement(self, name, category, yml, filename, backlog, source=None, signatures=None):
+        '''
+        Add a requirement from the loaded contents of its file.
+        '''
         text = ''
         deps = []
         if 'text' in yml:
             text = yml['text'].strip().replace("-\n", "").replace("\n", " ")
         if 'deps' in yml:
             deps = yml['deps']
-        req = Requirement(name, text, category, deps, filename, self.backlog)
+        req = Requirement(name, text, category, deps, filename, backlog, source, signatures)
         if name in self.requirements.keys():
             print("Error: Duplicate requirement names.")
             print(req.filename)
@@ -185,6 +234,130 @@ class ProjectState(object):
         if graphify:
             self.graphify()
 
+    def write_bundle(self, filename):
+        '''
+        Write all loaded requirements into a single multi-document YAML
+        file, for readers that have no use for the requirements directory.
+        
+        The first document is an index holding the project's public keys
+        and two tables, one line per entry: the byte offset, size and
+        path of each requirement file, and the requirement name, type,
+        signature and user of each signature, with the names quoted by
+        quote_field. Each requirement file then follows verbatim as its
+        own document, ended by `...`, so a reader can also take any one
+        of them from its offset alone.
+        '''
+        paths = []
+        sources = []
+        sig_lines = []
+        # keep the loading order, so the bundle loads into the same graph
+        for name in self.requirements.keys():
+            req = self.requirements[name]
+            source = req.source
+            if source is None:
+                with open(req.file, 'r') as f:
+                    source = f.read()
+            signatures = req.signatures
+            if signatures is None:
+                signatures = tracking.read_sigs(self.root, name)
+            paths.append(os.path.relpath(req.file, self.root or os.curdir))
+            sources.append(source)
+            for sig_type in sorted(signatures.keys()):
+                sig = signatures[sig_type]
+                sig_lines.append("    {0} {1} {2} {3}\n".format(quote_field(name), quote_field(sig_type),
+                                                                  sig['signature'], quote_field(sig['user'])))
+        
+        index = {}
+        index['qwerk_bundle'] = _bundle_version
+        index['project_name'] = self.name
+        index['pubkeys'] = self.pubkeys
+        if index['pubkeys'] is None:
+            index['pubkeys'] = tracking.read_pubkeys(self.root)
+        index_head = yaml.safe_dump(index, explicit_start=True, no_aliases=True)
+        sig_table = "signatures: |\n" + "".join(sig_lines)
+        
+        # a file that opens its own document, after any comments, with
+        # directives or `---` must not get a second one
+        separators = []
+        for path, source in zip(paths, sources):
+            if opens_document(source):
+                separators.append('')
+            else:
+                separators.append("--- # {0}\n".format(path))
+        endings = [document_end(source) for source in sources]
+        
+        # the offsets depend on the size of the index, which only grows
+        # with them, so repeat until it stops changing
+        head_size = 0
+        while True:
+            req_lines = []
+            offset = head_size
+            for path, separator, source, ending in zip(paths, separators, sources, endings):
+                offset += len(separator)
+                req_lines.append("    {0} {1} {2}\n".format(offset, len(source), path))
+                offset += len(source) + len(ending)
+            head = index_head + "requirements: |\n" + "".join(req_lines) + sig_table
+            if len(head) == head_size:
+                break
+            head_size = len(head)
+        
+        with open(filename, 'wb') as f:
+            f.write(head)
+            for separator, source, ending in zip(separators, sources, endings):
+                f.write(separator)
+                f.write(source)
+                f.write(ending)
+    
+    def load_bundle(self, filename, root_dirname=""):
+        '''
+        Load all requirements from a bundle made by write_bundle, with
+        a single read of the file. Requirement file names are taken
+        relative to root_dirname.
+        
+        Each requirement is parsed from the bytes its index line gives,
+        which must sit between a line break and the document's `...`,
+        or the bundle is rejected as damaged.
+        '''
+        self.root = root_dirname
+        with open(filename, 'rb') as f:
+            data = f.read()
+        # only the index document is parsed from the start of the file
+        loader = yaml.Loader(data)
+        try:
+            index = loader.get_data()
+        finally:
+            loader.dispose()
+        if not isinstance(index, dict) or index.get('qwerk_bundle') != _bundle_version:
+            print("Error: {0} is not a qwerk requirements bundle.".format(filename))
+            print("Exiting.")
+            exit()
+        self.pubkeys = index['pubkeys']
+        signatures = {}
+        for line in index['signatures'].splitlines():
+            name, sig_type, signature, user = line.split(' ')
+            signatures.setdefault(unquote_field(name), {})[unquote_field(sig_type)] = \
+                {'user': unquote_field(user), 'signature': signature}
+        for line in index['requirements'].splitlines():
+            offset, size, path = line.split(' ', 2)
+            offset = int(offset)
+            source = data[offset:offset + int(size)]
+            if data[offset - 1:offset] != "\n" or \
+                    not data.startswith(document_end(source), offset + len(source)):
+                print("Error: {0} is damaged, the document for {1} is not where its index says.".format(filename, path))
+                print("Exiting.")
+                exit()
+            yml = yaml.extract(source, ('text', 'deps'))
+            if not yml:
+                continue
+            # name, category and backlog come from the path, as when
+            # loading the requirements directory
+            name = os.path.basename(path)[:-2]
+            category = os.path.split(os.path.dirname(path))[1]
+            backlog = path.split(os.sep, 1)[0] == 'backlog'
+            self.add_requirement(name, category, yml, os.path.join(root_dirname, path),
+                                 backlog, source, signatures.get(name, {}))
+        self.graphify()
+
     def graph_out_req(self, key):
         '''
         Graphify a single requirement.
@@ -32,14 +32,14 @@ __date__ = "2014-02-22"
 __version__ = '3.1.4'
 
 from rsa.key import newkeys, PrivateKey, PublicKey
-from rsa.pkcs1 import encrypt, decrypt, sign, verify, DecryptionError, \
-    VerificationError
+from rsa.pkcs1 import encrypt, decrypt, sign, verify, verify_batch, \
+    DecryptionError, VerificationError
 
 # Do doctest if we're run directly
 if __name__ == "__main__":
     import doctest
     doctest.testmod()
 
-__all__ = ["newkeys", "encrypt", "decrypt", "sign", "verify", 'PublicKey',
-    'PrivateKey', 'DecryptionError', 'VerificationError']
+__all__ = ["newkeys", "encrypt", "decrypt", "sign", "verify", "verify_batch",
+    'PublicKey', 'PrivateKey', 'DecryptionError', 'VerificationError']
 
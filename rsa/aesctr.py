@@ -0,0 +1,244 @@
+'''AES in counter (CTR) mode, the stream cipher of the hybrid bigfile format.
+
+CTR mode only ever encrypts counter blocks, so just the forward cipher is
+implemented. It works on 32 bit words with lookup tables that combine
+SubBytes, ShiftRows and MixColumns for a whole column.
+'''
+
+import binascii
+import struct
+
+KEY_SIZES = (16, 24, 32)
+
+# The counter wraps around at 128 bits
+COUNTER_MASK = (1 << 128) - 1
+
+
+def _xtime(value):
+    '''Multiplies a byte by x (that is, 2) in GF(2^8).'''
+
+    value <<= 1
+    if value & 0x100:
+        value ^= 0x11B
+    return value
+
+
+def _make_sbox():
+    '''Returns the AES S-box.
+
+    Walks the multiplicative group of GF(2^8) with the generator 3 and its
+    inverse at the same time, and applies the affine transformation to each
+    inverse.
+    '''
+
+    sbox = [0x63] * 256
+    p = q = 1
+    while True:
+        p ^= _xtime(p)
+        q ^= q << 1
+        q ^= q << 2
+        q ^= q << 4
+        q &= 0xFF
+        if q & 0x80:
+            q ^= 0x09
+        rotated = q | (q << 8)
+        affine = (q ^ (rotated >> 7) ^ (rotated >> 6) ^ (rotated >> 5) ^
+                  (rotated >> 4)) & 0xFF
+        sbox[p] = affine ^ 0x63
+        if p == 1:
+            return sbox
+
+
+def _make_round_tables(sbox):
+    '''Returns the four lookup tables for an encryption round.
+
+    Each table maps a byte of the state to its column after SubBytes and
+    MixColumns, as a 32 bit word, rotated for each row of the state.
+    '''
+
+    te0 = []
+    for s in sbox:
+        s2 = _xtime(s)
+        te0.append((s2 << 24) | (s << 16) | (s << 8) | (s2 ^ s))
+    te1 = [(t >> 8) | ((t & 0xFF) << 24) for t in te0]
+    te2 = [(t >> 16) | ((t & 0xFFFF) << 16) for t in te0]
+    te3 = [(t >> 24) | ((t & 0xFFFFFF) << 8) for t in te0]
+    return (te0, te1, te2, te3)
+
+
+SBOX = _make_sbox()
+TE0, TE1, TE2, TE3 = _make_round_tables(SBOX)
+
+
+def _sub_word(word):
+    return (SBOX[word >> 24] << 24 | SBOX[(word >> 16) & 0xFF] << 16 |
+            SBOX[(word >> 8) & 0xFF] << 8 | SBOX[word & 0xFF])
+
+
+def expand_key(key):
+    '''Returns the round keys for the given AES key, as a list of big endian
+    32 bit words, and the number of rounds.
+
+    >>> (round_keys, rounds) = expand_key(b'\\x00' * 16)
+    >>> rounds, len(round_keys), '%08x' % round_keys[-1]
+    (10, 44, '6f8f188e')
+    '''
+
+    words = len(key) // 4
+    rounds = words + 6
+    round_keys = list(struct.unpack('>%dI' % words, key))
+    rcon = 1
+    for i in range(words, 4 * (rounds + 1)):
+        word = round_keys[i - 1]
+        if i % words == 0:
+            word = _sub_word(((word << 8) & 0xFFFFFFFF) | (word >> 24))
+            word ^= rcon << 24
+            rcon = _xtime(rcon)
+        elif words > 6 and i % words == 4:
+            word = _sub_word(word)
+        round_keys.append(round_keys[i - words] ^ word)
+
+    return (round_keys, rounds)
+
+
+class AESCounterMode(object):
+    '''AES in counter (CTR) mode, for encrypting streams of any length.
+
+    Encryption and decryption are the same operation.
+
+    :param key: the AES key, a string of 16, 24 or 32 bytes.
+    :param iv: the initial counter value, a string of 16 bytes that is never
+        used twice with the same key.
+    :param offset: the number of blocks after ``iv`` where the key stream
+        starts, so a stream can be split in parts that are encrypted
+        independently.
+
+    FIPS-197 appendix C.3, encrypting the plaintext block as the counter:
+
+    >>> key = binascii.unhexlify(b'000102030405060708090a0b0c0d0e0f'
+    ...                          b'101112131415161718191a1b1c1d1e1f')
+    >>> iv = binascii.unhexlify(b'00112233445566778899aabbccddeeff')
+    >>> ctr = AESCounterMode(key, iv)
+    >>> binascii.hexlify(ctr.crypt(b'\\x00' * 16)) == b'8ea2b7ca516745bfeafc49904b496089'
+    True
+
+    NIST SP 800-38A appendix F.5, CTR-AES128, CTR-AES192 and CTR-AES256:
+
+    >>> iv = binascii.unhexlify(b'f0f1f2f3f4f5f6f7f8f9fafbfcfdfeff')
+    >>> plaintext = binascii.unhexlify(b'6bc1bee22e409f96e93d7e117393172a'
+    ...                                b'ae2d8a571e03ac9c9eb76fac45af8e51'
+    ...                                b'30c81c46a35ce411e5fbc1191a0a52ef'
+    ...                                b'f69f2445df4f9b17ad2b417be66c3710')
+    >>> key = binascii.unhexlify(b'2b7e151628aed2a6abf7158809cf4f3c')
+    >>> binascii.hexlify(AESCounterMode(key, iv).crypt(plaintext)) == (
+    ...     b'874d6191b620e3261bef6864990db6ce9806f66b7970fdff8617187bb9fffdff'
+    ...     b'5ae4df3edbd5d35e5b4f09020db03eab1e031dda2fbe03d1792170a0f3009cee')
+    True
+    >>> key = binascii.unhexlify(b'8e73b0f7da0e6452c810f32b809079e5'
+    ...                          b'62f8ead2522c6b7b')
+    >>> binascii.hexlify(AESCounterMode(key, iv).crypt(plaintext)) == (
+    ...     b'1abc932417521ca24f2b0459fe7e6e0b090339ec0aa6faefd5ccc2c6f4ce8e94'
+    ...     b'1e36b26bd1ebc670d1bd1d665620abf74f78a7f6d29809585a97daec58c6b050')
+    True
+    >>> key = binascii.unhexlify(b'603deb1015ca71be2b73aef0857d7781'
+    ...                          b'1f352c073b6108d72d9810a30914dff4')
+    >>> binascii.hexlify(AESCounterMode(key, iv).crypt(plaintext)) == (
+    ...     b'601ec313775789a5b7a7f504bbf3d228f443e3ca4d62b59aca84e990cacaf5c5'
+    ...     b'2b0930daa23de94ce87017ba2d84988ddfc9c58db67aada613c2dd08457941a6')
+    True
+
+    Starting at an offset continues the same key stream, and the key stream
+    carries over between calls:
+
+    >>> ctr = AESCounterMode(key, iv, 2)
+    >>> ctr.crypt(plaintext[32:40]) + ctr.crypt(plaintext[40:]) == \\
+    ...     AESCounterMode(key, iv).crypt(plaintext)[32:]
+    True
+    '''
+
+    # Number of blocks of key stream generated at a time
+    STREAM_BLOCKS = 4096
+
+    def __init__(self, key, iv, offset=0):
+        if len(key) not in KEY_SIZES:
+            raise ValueError('Invalid key size: %i' % len(key))
+        if len(iv) != 16:
+            raise ValueError('Invalid IV size: %i' % len(iv))
+
+        (self.round_keys, self.rounds) = expand_key(key)
+        self.counter = (int(binascii.hexlify(iv), 16) + offset) & COUNTER_MASK
+        self.key_stream = b''
+
+    def encrypt_words(self, s0, s1, s2, s3):
+        '''Encrypts the 128 bit block given as four big endian 32 bit words.'''
+
+        te0, te1, te2, te3 = TE0, TE1, TE2, TE3
+        rk = self.round_keys
+        s0 ^= rk[0]
+        s1 ^= rk[1]
+        s2 ^= rk[2]
+        s3 ^= rk[3]
+        for r in range(4, 4 * self.rounds, 4):
+            t0 = (te0[s0 >> 24] ^ te1[(s1 >> 16) & 0xFF] ^
+                  te2[(s2 >> 8) & 0xFF] ^ te3[s3 & 0xFF] ^ rk[r])
+            t1 = (te0[s1 >> 24] ^ te1[(s2 >> 16) & 0xFF] ^
+                  te2[(s3 >> 8) & 0xFF] ^ te3[s0 & 0xFF] ^ rk[r + 1])
+            t2 = (te0[s2 >> 24] ^ te1[(s3 >> 16) & 0xFF] ^
+                  te2[(s0 >> 8) & 0xFF] ^ te3[s1 & 0xFF] ^ rk[r + 2])
+            s3 = (te0[s3 >> 24] ^ te1[(s0 >> 16) & 0xFF] ^
+                  te2[(s1 >> 8) & 0xFF] ^ te3[s2 & 0xFF] ^ rk[r + 3])
+            s0, s1, s2 = t0, t1, t2
+
+        # The final round has no MixColumns
+        sbox = SBOX
+        r = 4 * self.rounds
+        return ((sbox[s0 >> 24] << 24 | sbox[(s1 >> 16) & 0xFF] << 16 |
+                 sbox[(s2 >> 8) & 0xFF] << 8 | sbox[s3 & 0xFF]) ^ rk[r],
+                (sbox[s1 >> 24] << 24 | sbox[(s2 >> 16) & 0xFF] << 16 |
+                 sbox[(s3 >> 8) & 0xFF] << 8 | sbox[s0 & 0xFF]) ^ rk[r + 1],
+                (sbox[s2 >> 24] << 24 | sbox[(s3 >> 16) & 0xFF] << 16 |
+                 sbox[(s0 >> 8) & 0xFF] << 8 | sbox[s1 & 0xFF]) ^ rk[r + 2],
+                (sbox[s3 >> 24] << 24 | sbox[(s0 >> 16) & 0xFF] << 16 |
+                 sbox[(s1 >> 8) & 0xFF] << 8 | sbox[s2 & 0xFF]) ^ rk[r + 3])
+
+    def generate_key_stream(self, blocks):
+        '''Returns the key stream for the next ``blocks`` counter values.'''
+
+        words = []
+        extend = words.extend
+        encrypt_words = self.encrypt_words
+        start = self.counter
+        for counter in range(start, start + blocks):
+            counter &= COUNTER_MASK
+            extend(encrypt_words(counter >> 96, (counter >> 64) & 0xFFFFFFFF,
+                                 (counter >> 32) & 0xFFFFFFFF,
+                                 counter & 0xFFFFFFFF))
+        self.counter = (start + blocks) & COUNTER_MASK
+        return struct.pack('>%dI' % len(words), *words)
+
+    def crypt(self, data):
+        '''Encrypts or decrypts a string of bytes, continuing the key stream
+        where the previous call left off.
+        '''
+
+        size = len(data)
+        if not size:
+            return b''
+
+        stream = self.key_stream
+        while len(stream) < size:
+            blocks = min(self.STREAM_BLOCKS, (size - len(stream) + 15) // 16)
+            stream += self.generate_key_stream(blocks)
+        self.key_stream = stream[size:]
+
+        # XOR the data with the key stream as two big integers
+        output = (int(binascii.hexlify(data), 16) ^
+                  int(binascii.hexlify(stream[:size]), 16))
+        return binascii.unhexlify('%0*x' % (2 * size, output))
+
+
+__all__ = ['AESCounterMode']
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
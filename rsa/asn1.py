@@ -3,7 +3,14 @@
 Not all ASN.1-handling code use these definitions, but when it does, they should be here.
 '''
 
+import binascii
+
 from pyasn1.type import univ, namedtype, tag
+from pyasn1.codec.ber import encoder
+from pyasn1.codec.der import encoder as der_encoder
+from pyasn1 import error
+
+from rsa._compat import b
 
 class PubKeyHeader(univ.Sequence):
     componentType = namedtype.NamedTypes(
@@ -33,3 +40,227 @@ class AsnPubKey(univ.Sequence):
         namedtype.NamedType('modulus', univ.Integer()),
         namedtype.NamedType('publicExponent', univ.Integer()),
     )
+
+
+class AsnPrivKey(univ.Sequence):
+    '''ASN.1 contents of DER encoded private key:
+
+    RSAPrivateKey ::= SEQUENCE {
+         version           Version,
+         modulus           INTEGER,  -- n
+         publicExponent    INTEGER,  -- e
+         privateExponent   INTEGER,  -- d
+         prime1            INTEGER,  -- p
+         prime2            INTEGER,  -- q
+         exponent1         INTEGER,  -- d mod (p-1)
+         exponent2         INTEGER,  -- d mod (q-1)
+         coefficient       INTEGER,  -- (inverse of q) mod p
+         otherPrimeInfos   OtherPrimeInfos OPTIONAL
+    }
+
+    The otherPrimeInfos are only used in multi-prime keys, which aren't
+    supported, so they're left out here.
+    '''
+
+    componentType = namedtype.NamedTypes(
+        namedtype.NamedType('version', univ.Integer()),
+        namedtype.NamedType('modulus', univ.Integer()),
+        namedtype.NamedType('publicExponent', univ.Integer()),
+        namedtype.NamedType('privateExponent', univ.Integer()),
+        namedtype.NamedType('prime1', univ.Integer()),
+        namedtype.NamedType('prime2', univ.Integer()),
+        namedtype.NamedType('exponent1', univ.Integer()),
+        namedtype.NamedType('exponent2', univ.Integer()),
+        namedtype.NamedType('coefficient', univ.Integer()),
+    )
+
+
+# Used for the tag, length and INTEGER octets, so compiled codecs produce
+# exactly what the generic encoder does.
+_item_encoder = encoder.AbstractItemEncoder()
+_integer_encoder = encoder.IntegerEncoder()
+
+def _tag_octets(asn1_type, constructed):
+    tag_set = asn1_type.getTagSet()
+    if len(tag_set) != 1:
+        raise error.PyAsn1Error('Explicitly tagged %r can not be compiled'
+                                % asn1_type)
+    return bytearray(_item_encoder.encodeTag(tag_set[-1], constructed))
+
+def _read_length(substrate, pos):
+    '''Returns (length, position of the first value octet).'''
+
+    if pos >= len(substrate):
+        raise error.SubstrateUnderrunError('Short octet stream on length decoding')
+    first = substrate[pos]
+    if first < 0x80:
+        return (first, pos + 1)
+    if first == 0x80:
+        raise error.PyAsn1Error('Indefinite length not supported by compiled codec')
+    size = first & 0x7F
+    length = 0
+    for octet in substrate[pos + 1:pos + 1 + size]:
+        length = (length << 8) | octet
+    return (length, pos + 1 + size)
+
+def _decode_integer(contents):
+    if not contents:
+        return 0
+    value = int(binascii.hexlify(contents), 16)
+    if contents[0] & 0x80:
+        value -= 1 << (8 * len(contents))
+    return value
+
+def _decode_octets(contents):
+    return bytes(contents)
+
+def _decode_null(contents):
+    if contents:
+        raise error.PyAsn1Error('Unexpected %d-octet substrate for Null'
+                                % len(contents))
+    return None
+
+def _decode_oid(contents):
+    if not contents:
+        raise error.PyAsn1Error('Empty substrate')
+    oid = divmod(contents[0], 40)
+    sub_id = 0
+    for octet in contents[1:]:
+        if sub_id == 0 and octet == 0x80:
+            raise error.PyAsn1Error('Invalid leading 0x80 in sub-OID')
+        sub_id = (sub_id << 7) | (octet & 0x7F)
+        if not octet & 0x80:
+            oid += (sub_id,)
+            sub_id = 0
+    if contents[-1] & 0x80:
+        raise error.SubstrateUnderrunError('Short substrate for sub-OID past %s'
+                                           % (oid,))
+    return oid
+
+def _encode_integer(value):
+    return _integer_encoder.encodeValue(None, value, 1, 0)[0]
+
+def _encode_octets(value):
+    return bytes(value)
+
+def _encode_null(value):
+    return b('')
+
+def _encode_oid(value):
+    # The TLV of the OID is built by the generic encoder, then split up again.
+    encoded = bytearray(der_encoder.encode(univ.ObjectIdentifier(value)))
+    (_, pos) = _read_length(encoded, 1)
+    return bytes(encoded[pos:])
+
+class CompiledSequence(object):
+    '''DER codec for one fixed :py:class:`univ.Sequence` type.
+
+    The components of the type are looked at once, when the codec is created,
+    so decoding doesn't go through pyasn1's tag maps, component cloning and
+    constraint checks. Components may be INTEGER, OCTET STRING (also
+    implicitly tagged), NULL, OBJECT IDENTIFIER or a nested SEQUENCE, which
+    is compiled as well. Optional, defaulted and explicitly tagged
+    components are not supported.
+
+    Values are plain Python objects: int, byte string, None for NULL, tuple
+    for OBJECT IDENTIFIER and dict for SEQUENCE.
+
+    >>> codec = CompiledSequence(AsnPubKey())
+    >>> der = codec.encode({'modulus': 2367317549, 'publicExponent': 65537})
+    >>> (value, rest) = codec.decode(der)
+    >>> value == {'modulus': 2367317549, 'publicExponent': 65537}
+    True
+    >>> from pyasn1.codec.der import decoder
+    >>> (generic, _) = decoder.decode(der, asn1Spec=AsnPubKey())
+    >>> int(generic['modulus'])
+    2367317549
+    '''
+
+    def __init__(self, spec):
+        self.tag = _tag_octets(spec, True)
+        self.components = []
+
+        named_types = spec.getComponentType()
+        for idx in range(len(named_types)):
+            named_type = named_types[idx]
+            if named_type.isOptional or named_type.isDefaulted:
+                raise error.PyAsn1Error('Optional component %s can not be '
+                                        'compiled' % named_type.getName())
+            asn1_type = named_type.getType()
+            self.components.append((named_type.getName(),)
+                                   + self._compile(asn1_type))
+
+    def _compile(self, asn1_type):
+        '''Returns (tag octets, decode function, encode function).'''
+
+        if isinstance(asn1_type, univ.Sequence):
+            nested = CompiledSequence(asn1_type)
+            return (nested.tag, nested._decode_contents, nested._encode_contents)
+
+        # Boolean derives from Integer but is not DER-encoded like one.
+        if isinstance(asn1_type, univ.Integer) and \
+                not isinstance(asn1_type, univ.Boolean):
+            return (_tag_octets(asn1_type, False), _decode_integer, _encode_integer)
+        elif isinstance(asn1_type, univ.OctetString):
+            return (_tag_octets(asn1_type, False), _decode_octets, _encode_octets)
+        elif isinstance(asn1_type, univ.Null):
+            return (_tag_octets(asn1_type, False), _decode_null, _encode_null)
+        elif isinstance(asn1_type, univ.ObjectIdentifier):
+            return (_tag_octets(asn1_type, False), _decode_oid, _encode_oid)
+
+        raise error.PyAsn1Error('%r can not be compiled' % asn1_type)
+
+    def decode(self, substrate):
+        '''Decodes DER substrate.
+
+        :returns: (dict of component values, remaining substrate)
+        '''
+
+        substrate = bytearray(substrate)
+        (value, pos) = self._decode_tlv(substrate, 0, self.tag,
+                                        self._decode_contents)
+        return (value, bytes(substrate[pos:]))
+
+    def encode(self, value):
+        '''Encodes a dict of component values to DER.'''
+
+        return self._encode_tlv(self.tag, self._encode_contents(value))
+
+    def _decode_tlv(self, substrate, pos, tag_octets, decode_contents):
+        end = pos + len(tag_octets)
+        if substrate[pos:end] != tag_octets:
+            raise error.PyAsn1Error('Unexpected tag at offset %i' % pos)
+        (length, start) = _read_length(substrate, end)
+        end = start + length
+        if end > len(substrate):
+            raise error.SubstrateUnderrunError('%d-octet short'
+                                               % (end - len(substrate)))
+        return (decode_contents(substrate[start:end]), end)
+
+    def _decode_contents(self, contents):
+        value = {}
+        pos = 0
+        for (name, tag_octets, decode_contents, _) in self.components:
+            (value[name], pos) = self._decode_tlv(contents, pos, tag_octets,
+                                                  decode_contents)
+        if pos != len(contents):
+            raise error.PyAsn1Error('Unexpected %d octets after last component'
+                                    % (len(contents) - pos))
+        return value
+
+    def _encode_tlv(self, tag_octets, contents):
+        return b('').join([bytes(tag_octets),
+                           _item_encoder.encodeLength(len(contents), 1),
+                           contents])
+
+    def _encode_contents(self, value):
+        return b('').join([self._encode_tlv(tag_octets, encode_contents(value[name]))
+                           for (name, tag_octets, _, encode_contents)
+                           in self.components])
+
+
+# Compiled once, used by the key loaders and savers in rsa.key.
+pub_key_codec = CompiledSequence(AsnPubKey())
+priv_key_codec = CompiledSequence(AsnPrivKey())
+openssl_pub_key_codec = CompiledSequence(OpenSSLPubKey())
+
@@ -37,23 +37,176 @@ The encrypted file format is as follows, where || denotes byte concatenation:
 This file format is called the VARBLOCK format, in line with the varint format
 used to denote the block sizes.
 
+Encrypting every block with RSA is slow, especially decryption. With
+``hybrid=True`` the file is instead encrypted with AES-256 in counter mode,
+using a random session key that is encrypted with RSA. This is VERSION 3 of
+the VARBLOCK format:
+
+    FILE := VERSION || BLOCK(KEYS) || BLOCK(IV) || BLOCK(DATA) ... ||
+            BLOCK(MAC)
+
+    KEYS := the AES key and the HMAC key, 32 bytes each, PKCS#1 encrypted with
+    the public key.
+
+    IV := the 16 byte initial counter value.
+
+    DATA := the AES-CTR encrypted cleartext, in blocks of ``CHUNK_SIZE``
+    bytes; only the last one can be shorter. The counter of a block starts at
+    IV plus the byte offset of the block in the cleartext, divided by 16.
+
+    MAC := HMAC-SHA256 of VERSION || IV || BLOCK(DATA) || BLOCK(DATA) ...,
+    so the length of every DATA block is authenticated with its contents.
+
+:py:func:`decrypt_bigfile` handles both versions.
+
+Every block is encrypted independently, so with a ``poolsize`` larger than 1
+the blocks are handed to a pool of worker processes in batches. Reading,
+encrypting or decrypting and writing then overlap, and the output is written
+in the original block order.
+
 '''
 
+import collections
+import hashlib
+import hmac
+import multiprocessing as mp
+import os
+import shutil
+import tempfile
+
 from rsa import key, common, pkcs1, varblock
+from rsa.aesctr import AESCounterMode
 from rsa._compat import byte
 
-def encrypt_bigfile(infile, outfile, pub_key):
+HYBRID_VERSION = 3
+
+# Size in bytes of the AES key and of the HMAC key
+SESSION_KEY_SIZE = 32
+
+# Size in bytes of the DATA blocks in the hybrid format, a multiple of the
+# AES block size.
+CHUNK_SIZE = 64 * 1024
+
+# Blocks sent to a worker process at once, to keep the inter-process
+# communication overhead per block low.
+BLOCKS_PER_TASK = 32
+
+def _encrypt_blocks(blocks, pub_key):
+    return [pkcs1.encrypt(block, pub_key) for block in blocks]
+
+def _decrypt_blocks(blocks, priv_key):
+    return [pkcs1.decrypt(block, priv_key) for block in blocks]
+
+def _crypt_chunks(chunks, session):
+    '''AES-CTR encrypts or decrypts (offset, chunk) pairs, where offset is
+    the byte offset of the chunk in the cleartext.'''
+
+    (aes_key, iv) = session
+    return [AESCounterMode(aes_key, iv, offset // 16).crypt(chunk)
+            for (offset, chunk) in chunks]
+
+def _with_offsets(chunks):
+    '''Generator, yields (offset, chunk) pairs for the chunks of a stream.'''
+
+    offset = 0
+    for chunk in chunks:
+        yield (offset, chunk)
+        offset += len(chunk)
+
+def _update_mac(mac, block):
+    '''Updates the HMAC with a block, as it is written in the file.'''
+
+    mac.update(varblock.encode_varint(len(block)))
+    mac.update(block)
+
+def _authenticate(blocks, mac, tail):
+    '''Generator, yields all but the last block and updates the HMAC with
+    them. The last block is appended to the 'tail' list.
+
+    Only the last of the yielded blocks can be shorter than ``CHUNK_SIZE``,
+    as when encrypting, so a file with its DATA blocks split differently is
+    rejected.
+    '''
+
+    previous = None
+    short_block = False
+    for block in blocks:
+        if previous is not None:
+            if short_block or len(previous) > CHUNK_SIZE:
+                raise pkcs1.DecryptionError('Decryption failed')
+            short_block = len(previous) != CHUNK_SIZE
+            _update_mac(mac, previous)
+            yield previous
+        previous = block
+
+    tail.append(previous)
+
+def _batches(blocks):
+    batch = []
+    for block in blocks:
+        batch.append(block)
+        if len(batch) == BLOCKS_PER_TASK:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+def _map_blocks(function, blocks, key, poolsize):
+    '''Generator, yields the result of function(batch, key) for each batch of
+    blocks, in order.
+
+    With a poolsize larger than 1, at most two batches per process are being
+    worked on (or waiting to be written) at a time, so memory use doesn't
+    depend on the file size.
+    '''
+
+    if poolsize < 1:
+        raise ValueError('Pool size (%i) should be >= 1' % poolsize)
+
+    if poolsize == 1:
+        for batch in _batches(blocks):
+            yield function(batch, key)
+        return
+
+    pool = mp.Pool(poolsize)
+    try:
+        pending = collections.deque()
+        for batch in _batches(blocks):
+            pending.append(pool.apply_async(function, (batch, key)))
+            if len(pending) >= 2 * poolsize:
+                yield pending.popleft().get()
+
+        while pending:
+            yield pending.popleft().get()
+    except:
+        pool.terminate()
+        raise
+    else:
+        pool.close()
+    finally:
+        pool.join()
+
+def encrypt_bigfile(infile, outfile, pub_key, poolsize=1, hybrid=False):
     '''Encrypts a file, writing it to 'outfile' in VARBLOCK format.
     
     :param infile: file-like object to read the cleartext from
     :param outfile: file-like object to write the crypto in VARBLOCK format to
     :param pub_key: :py:class:`rsa.PublicKey` to encrypt with
+    :param poolsize: the number of processes to encrypt with
+    :param hybrid: when True, encrypt with a random AES session key in the
+        version 3 format. The key must be at least 600 bits to encrypt the
+        session key.
 
     '''
 
     if not isinstance(pub_key, key.PublicKey):
         raise TypeError('Public key required, but got %r' % pub_key)
 
+    if hybrid:
+        _encrypt_hybrid(infile, outfile, pub_key, poolsize)
+        return
+
     key_bytes = common.bit_size(pub_key.n) // 8
     blocksize = key_bytes - 11 # keep space for PKCS#1 padding
 
@@ -61,27 +214,98 @@ def encrypt_bigfile(infile, outfile, pub_key):
     outfile.write(byte(varblock.VARBLOCK_VERSION))
 
     # Encrypt and write each block
-    for block in varblock.yield_fixedblocks(infile, blocksize):
-        crypto = pkcs1.encrypt(block, pub_key)
+    blocks = varblock.yield_fixedblocks(infile, blocksize)
+    for cryptos in _map_blocks(_encrypt_blocks, blocks, pub_key, poolsize):
+        varblock.write_varblocks(outfile, cryptos)
+
+def _encrypt_hybrid(infile, outfile, pub_key, poolsize):
+    '''Encrypts a file in the version 3 VARBLOCK format.'''
+
+    session_key = os.urandom(2 * SESSION_KEY_SIZE)
+    aes_key = session_key[:SESSION_KEY_SIZE]
+    mac_key = session_key[SESSION_KEY_SIZE:]
+    iv = os.urandom(16)
+    wrapped_key = pkcs1.encrypt(session_key, pub_key)
+
+    outfile.write(byte(HYBRID_VERSION))
+    varblock.write_varblocks(outfile, [wrapped_key, iv])
 
-        varblock.write_varint(outfile, len(crypto))
-        outfile.write(crypto)
+    mac = hmac.new(mac_key, byte(HYBRID_VERSION) + iv, hashlib.sha256)
+    chunks = _with_offsets(varblock.yield_fixedblocks(infile, CHUNK_SIZE))
+    session = (aes_key, iv)
+    for cryptos in _map_blocks(_crypt_chunks, chunks, session, poolsize):
+        for crypto in cryptos:
+            _update_mac(mac, crypto)
+        varblock.write_varblocks(outfile, cryptos)
 
-def decrypt_bigfile(infile, outfile, priv_key):
+    varblock.write_varblocks(outfile, [mac.digest()])
+
+def decrypt_bigfile(infile, outfile, priv_key, poolsize=1):
     '''Decrypts an encrypted VARBLOCK file, writing it to 'outfile'
+
+    Both the RSA-only and the hybrid format are supported. The cleartext of
+    the hybrid format is kept in a temporary file until the whole file has
+    been authenticated, so nothing is written to 'outfile' when a
+    :py:class:`rsa.pkcs1.DecryptionError` is raised.
     
     :param infile: file-like object to read the crypto in VARBLOCK format from
     :param outfile: file-like object to write the cleartext to
     :param priv_key: :py:class:`rsa.PrivateKey` to decrypt with
+    :param poolsize: the number of processes to decrypt with
 
     '''
 
     if not isinstance(priv_key, key.PrivateKey):
         raise TypeError('Private key required, but got %r' % priv_key)
-    
-    for block in varblock.yield_varblocks(infile):
-        cleartext = pkcs1.decrypt(block, priv_key)
-        outfile.write(cleartext)
 
-__all__ = ['encrypt_bigfile', 'decrypt_bigfile']
+    reader = varblock.VarblockReader(infile)
+    version = reader.read_version()
+    blocks = (block.tobytes() for block in reader.iter_blocks())
+
+    if version == HYBRID_VERSION:
+        _decrypt_hybrid(blocks, outfile, priv_key, poolsize)
+        return
+
+    if version != varblock.VARBLOCK_VERSION:
+        raise ValueError('VARBLOCK version %i not supported' % version)
+
+    for cleartexts in _map_blocks(_decrypt_blocks, blocks, priv_key, poolsize):
+        for cleartext in cleartexts:
+            outfile.write(cleartext)
+
+def _decrypt_hybrid(blocks, outfile, priv_key, poolsize):
+    '''Decrypts the blocks of a version 3 VARBLOCK file.'''
+
+    try:
+        wrapped_key = next(blocks)
+        iv = next(blocks)
+    except StopIteration:
+        raise EOFError('EOF while reading the hybrid VARBLOCK header')
+
+    session_key = pkcs1.decrypt(wrapped_key, priv_key)
+    if len(session_key) != 2 * SESSION_KEY_SIZE or len(iv) != 16:
+        raise pkcs1.DecryptionError('Decryption failed')
 
+    aes_key = session_key[:SESSION_KEY_SIZE]
+    mac_key = session_key[SESSION_KEY_SIZE:]
+
+    mac = hmac.new(mac_key, byte(HYBRID_VERSION) + iv, hashlib.sha256)
+    tail = []
+    chunks = _with_offsets(_authenticate(blocks, mac, tail))
+    session = (aes_key, iv)
+    with tempfile.TemporaryFile() as cleartext_file:
+        for cleartexts in _map_blocks(_crypt_chunks, chunks, session,
+                                      poolsize):
+            for cleartext in cleartexts:
+                cleartext_file.write(cleartext)
+
+        if tail[0] is None:
+            raise EOFError('EOF while reading the hybrid VARBLOCK MAC')
+
+        if not hmac.compare_digest(tail[0], mac.digest()):
+            raise pkcs1.DecryptionError('Decryption failed')
+
+        cleartext_file.seek(0)
+        shutil.copyfileobj(cleartext_file, outfile, CHUNK_SIZE)
+
+__all__ = ['encrypt_bigfile', 'decrypt_bigfile']
@@ -153,6 +153,8 @@ class CryptoOperation(object):
                 help='Key format of the %s key - default PEM' % self.keyname,
                 choices=('PEM', 'DER'), default='PEM')
 
+        self.add_options(parser)
+
         (cli, cli_args) = parser.parse_args(sys.argv[1:])
 
         if len(cli_args) != self.expected_cli_args:
@@ -161,6 +163,12 @@ class CryptoOperation(object):
 
         return (cli, cli_args)
 
+    def add_options(self, parser):
+        '''Adds the program's own options to the parser.
+
+        Override in a subclass.
+        '''
+
     def read_key(self, filename, keyform):
         '''Reads a public or private key.'''
 
@@ -309,7 +317,22 @@ class BigfileOperation(CryptoOperation):
 
         # Call the operation
         print(self.operation_progressive.title(), file=sys.stderr)
-        self.perform_operation(infile, outfile, key, cli_args)
+        self.perform_operation(infile, outfile, key, cli_args, cli.poolsize,
+                **self.operation_options(cli))
+
+    def add_options(self, parser):
+        parser.add_option('-p', '--poolsize', type='int', default=1,
+                help='Number of processes to %s with - default 1'
+                % self.operation)
+
+    def operation_options(self, cli):
+        '''Returns the keyword arguments for perform_operation() taken from
+        the program's own options.
+
+        Override in a subclass.
+        '''
+
+        return {}
 
     def get_infile(self, inname):
         '''Returns the input file object'''
@@ -343,31 +366,44 @@ class EncryptBigfileOperation(BigfileOperation):
     keyname = 'public'
     description = ('Encrypts a file to an encrypted VARBLOCK file. The file '
             'can be larger than the key length, but the output file is only '
-            'compatible with Python-RSA.')
+            'compatible with Python-RSA. Use --hybrid to encrypt large files '
+            'with a random AES key, which is much faster.')
     operation = 'encrypt'
     operation_past = 'encrypted'
     operation_progressive = 'encrypting'
 
-    def perform_operation(self, infile, outfile, pub_key, cli_args=None):
+    def add_options(self, parser):
+        BigfileOperation.add_options(self, parser)
+        parser.add_option('--hybrid', action='store_true', default=False,
+                help='Encrypt with a random AES key, which is encrypted with '
+                'the RSA key. The key must be at least 600 bits.')
+
+    def operation_options(self, cli):
+        return {'hybrid': cli.hybrid}
+
+    def perform_operation(self, infile, outfile, pub_key, cli_args=None,
+                          poolsize=1, hybrid=False):
         '''Encrypts files to VARBLOCK.'''
 
-        return rsa.bigfile.encrypt_bigfile(infile, outfile, pub_key)
+        return rsa.bigfile.encrypt_bigfile(infile, outfile, pub_key, poolsize,
+                                           hybrid)
 
 class DecryptBigfileOperation(BigfileOperation):
     '''Decrypts a file in VARBLOCK format.'''
 
     keyname = 'private'
     description = ('Decrypts an encrypted VARBLOCK file that was encrypted '
-            'with pyrsa-encrypt-bigfile')
+            'with pyrsa-encrypt-bigfile, with or without --hybrid')
     operation = 'decrypt'
     operation_past = 'decrypted'
     operation_progressive = 'decrypting'
     key_class = rsa.PrivateKey
 
-    def perform_operation(self, infile, outfile, priv_key, cli_args=None):
+    def perform_operation(self, infile, outfile, priv_key, cli_args=None,
+                          poolsize=1):
         '''Decrypts a VARBLOCK file.'''
 
-        return rsa.bigfile.decrypt_bigfile(infile, outfile, priv_key)
+        return rsa.bigfile.decrypt_bigfile(infile, outfile, priv_key, poolsize)
 
 
 encrypt = EncryptOperation()
@@ -41,6 +41,12 @@ def bit_size(num):
     :returns:
         Returns the number of bits in the integer.
     '''
+    try:
+        return num.bit_length()
+    except AttributeError:
+        # Python < 2.7, or not an integer at all.
+        pass
+
     if num == 0:
         return 0
     if num < 0:
@@ -154,11 +154,10 @@ class PublicKey(AbstractKey):
 
         '''
 
-        from pyasn1.codec.der import decoder
-        from rsa.asn1 import AsnPubKey
-        
-        (priv, _) = decoder.decode(keyfile, asn1Spec=AsnPubKey())
-        return cls(n=int(priv['modulus']), e=int(priv['publicExponent']))
+        from rsa.asn1 import pub_key_codec
+
+        (priv, _) = pub_key_codec.decode(keyfile)
+        return cls(n=priv['modulus'], e=priv['publicExponent'])
 
     def _save_pkcs1_der(self):
         '''Saves the public key in PKCS#1 DER format.
@@ -166,15 +165,10 @@ class PublicKey(AbstractKey):
         @returns: the DER-encoded public key.
         '''
 
-        from pyasn1.codec.der import encoder
-        from rsa.asn1 import AsnPubKey
-
-        # Create the ASN object
-        asn_key = AsnPubKey()
-        asn_key.setComponentByName('modulus', self.n)
-        asn_key.setComponentByName('publicExponent', self.e)
+        from rsa.asn1 import pub_key_codec
 
-        return encoder.encode(asn_key)
+        return pub_key_codec.encode({'modulus': self.n,
+                                     'publicExponent': self.e})
 
     @classmethod
     def _load_pkcs1_pem(cls, keyfile):
@@ -227,13 +221,11 @@ class PublicKey(AbstractKey):
         @return: a PublicKey object
         '''
     
-        from rsa.asn1 import OpenSSLPubKey
-        from pyasn1.codec.der import decoder
-        from pyasn1.type import univ
-        
-        (keyinfo, _) = decoder.decode(keyfile, asn1Spec=OpenSSLPubKey())
-        
-        if keyinfo['header']['oid'] != univ.ObjectIdentifier('1.2.840.113549.1.1.1'):
+        from rsa.asn1 import openssl_pub_key_codec
+
+        (keyinfo, _) = openssl_pub_key_codec.decode(keyfile)
+
+        if keyinfo['header']['oid'] != (1, 2, 840, 113549, 1, 1, 1):
             raise TypeError("This is not a DER-encoded OpenSSL-compatible public key")
                 
         return cls._load_pkcs1_der(keyinfo['key'][1:])
@@ -346,8 +338,17 @@ class PrivateKey(AbstractKey):
 
         '''
 
+        from pyasn1 import error
         from pyasn1.codec.der import decoder
-        (priv, _) = decoder.decode(keyfile)
+        from rsa.asn1 import priv_key_codec
+
+        try:
+            (fields, _) = priv_key_codec.decode(keyfile)
+            priv = [fields[name] for (name, _, _, _) in priv_key_codec.components]
+        except error.PyAsn1Error:
+            # Not a plain two-prime key; let the generic decoder have a go,
+            # so that e.g. the version check below still applies.
+            (priv, _) = decoder.decode(keyfile)
 
         # ASN.1 contents of DER encoded private key:
         #
@@ -376,35 +377,19 @@ class PrivateKey(AbstractKey):
         @returns: the DER-encoded private key.
         '''
 
-        from pyasn1.type import univ, namedtype
-        from pyasn1.codec.der import encoder
-
-        class AsnPrivKey(univ.Sequence):
-            componentType = namedtype.NamedTypes(
-                namedtype.NamedType('version', univ.Integer()),
-                namedtype.NamedType('modulus', univ.Integer()),
-                namedtype.NamedType('publicExponent', univ.Integer()),
-                namedtype.NamedType('privateExponent', univ.Integer()),
-                namedtype.NamedType('prime1', univ.Integer()),
-                namedtype.NamedType('prime2', univ.Integer()),
-                namedtype.NamedType('exponent1', univ.Integer()),
-                namedtype.NamedType('exponent2', univ.Integer()),
-                namedtype.NamedType('coefficient', univ.Integer()),
-            )
-
-        # Create the ASN object
-        asn_key = AsnPrivKey()
-        asn_key.setComponentByName('version', 0)
-        asn_key.setComponentByName('modulus', self.n)
-        asn_key.setComponentByName('publicExponent', self.e)
-        asn_key.setComponentByName('privateExponent', self.d)
-        asn_key.setComponentByName('prime1', self.p)
-        asn_key.setComponentByName('prime2', self.q)
-        asn_key.setComponentByName('exponent1', self.exp1)
-        asn_key.setComponentByName('exponent2', self.exp2)
-        asn_key.setComponentByName('coefficient', self.coef)
-
-        return encoder.encode(asn_key)
+        from rsa.asn1 import priv_key_codec
+
+        return priv_key_codec.encode({
+            'version': 0,
+            'modulus': self.n,
+            'publicExponent': self.e,
+            'privateExponent': self.d,
+            'prime1': self.p,
+            'prime2': self.q,
+            'exponent1': self.exp1,
+            'exponent2': self.exp2,
+            'coefficient': self.coef,
+        })
 
     @classmethod
     def _load_pkcs1_pem(cls, keyfile):
@@ -430,7 +415,8 @@ class PrivateKey(AbstractKey):
         der = self._save_pkcs1_der()
         return rsa.pem.save_pem(der, b('RSA PRIVATE KEY'))
 
-def find_p_q(nbits, getprime_func=rsa.prime.getprime, accurate=True):
+def find_p_q(nbits, getprime_func=rsa.prime.getprime, accurate=True,
+             getprimes_func=None):
     ''''Returns a tuple of two different primes of nbits bits each.
     
     The resulting p * q has exacty 2 * nbits bits, and the returned p and q
@@ -443,6 +429,10 @@ def find_p_q(nbits, getprime_func=rsa.prime.getprime, accurate=True):
         *Introduced in Python-RSA 3.1*
 
     :param accurate: whether to enable accurate mode or not.
+    :param getprimes_func: optional function that returns a list with a prime
+        for each number of bits in a list, such as
+        :py:meth:`rsa.parallel.PrimePool.getprimes`. When given, the initial p
+        and q are searched for at the same time.
     :returns: (p, q), where p > q
 
     >>> (p, q) = find_p_q(128)
@@ -470,10 +460,14 @@ def find_p_q(nbits, getprime_func=rsa.prime.getprime, accurate=True):
     qbits = nbits - shift
     
     # Choose the two initial primes
-    log.debug('find_p_q(%i): Finding p', nbits)
-    p = getprime_func(pbits)
-    log.debug('find_p_q(%i): Finding q', nbits)
-    q = getprime_func(qbits)
+    if getprimes_func is not None:
+        log.debug('find_p_q(%i): Finding p and q', nbits)
+        (p, q) = getprimes_func([pbits, qbits])
+    else:
+        log.debug('find_p_q(%i): Finding p', nbits)
+        p = getprime_func(pbits)
+        log.debug('find_p_q(%i): Finding q', nbits)
+        q = getprime_func(qbits)
 
     def is_acceptable(p, q):
         '''Returns True iff p and q are acceptable:
@@ -530,7 +524,7 @@ def calculate_keys(p, q, nbits):
 
     return (e, d)
 
-def gen_keys(nbits, getprime_func, accurate=True):
+def gen_keys(nbits, getprime_func, accurate=True, getprimes_func=None):
     '''Generate RSA keys of nbits bits. Returns (p, q, e, d).
 
     Note: this can take a long time, depending on the key size.
@@ -539,14 +533,16 @@ def gen_keys(nbits, getprime_func, accurate=True):
         ``q`` will use ``nbits/2`` bits.
     :param getprime_func: either :py:func:`rsa.prime.getprime` or a function
         with similar signature.
+    :param getprimes_func: optional function to find p and q at the same time,
+        see :py:func:`find_p_q`.
     '''
 
-    (p, q) = find_p_q(nbits // 2, getprime_func, accurate)
+    (p, q) = find_p_q(nbits // 2, getprime_func, accurate, getprimes_func)
     (e, d) = calculate_keys(p, q, nbits // 2)
 
     return (p, q, e, d)
 
-def newkeys(nbits, accurate=True, poolsize=1):
+def newkeys(nbits, accurate=True, poolsize=1, pool=None):
     '''Generates public and private keys, and returns them as (pub, priv).
 
     The public key is also known as the 'encryption key', and is a
@@ -560,6 +556,9 @@ def newkeys(nbits, accurate=True, poolsize=1):
     :param poolsize: the number of processes to use to generate the prime
         numbers. If set to a number > 1, a parallel algorithm will be used.
         This requires Python 2.6 or newer.
+    :param pool: an existing :py:class:`rsa.parallel.PrimePool` to generate
+        the prime numbers with. When given, ``poolsize`` is ignored and the
+        pool is left running.
 
     :returns: a tuple (:py:class:`rsa.PublicKey`, :py:class:`rsa.PrivateKey`)
 
@@ -574,16 +573,19 @@ def newkeys(nbits, accurate=True, poolsize=1):
     if poolsize < 1:
         raise ValueError('Pool size (%i) should be >= 1' % poolsize)
 
-    # Determine which getprime function to use
-    if poolsize > 1:
+    # Determine which getprime function to use, and generate the key
+    # components. A parallel search looks for p and q at the same time.
+    if pool is not None:
+        (p, q, e, d) = gen_keys(nbits, pool.getprime,
+                                getprimes_func=pool.getprimes)
+    elif poolsize > 1:
         from rsa import parallel
-        import functools
-
-        getprime_func = functools.partial(parallel.getprime, poolsize=poolsize)
-    else: getprime_func = rsa.prime.getprime
 
-    # Generate the key components
-    (p, q, e, d) = gen_keys(nbits, getprime_func)
+        with parallel.PrimePool(poolsize) as pool:
+            (p, q, e, d) = gen_keys(nbits, pool.getprime,
+                                    getprimes_func=pool.getprimes)
+    else:
+        (p, q, e, d) = gen_keys(nbits, rsa.prime.getprime)
     
     # Create the key objects
     n = p * q
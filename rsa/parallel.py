@@ -26,27 +26,197 @@ Introduced in Python-RSA 3.1.
 
 from __future__ import print_function
 
+import collections
 import multiprocessing as mp
 
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
 import rsa.prime
-import rsa.randnum
 
-def _find_prime(nbits, pipe):
-    while True:
-        integer = rsa.randnum.read_random_int(nbits)
+class PrimePool(object):
+    '''A pool of worker processes that search for primes.
+
+    The pool is created once and can be used for any number of primes, so
+    generating a key only starts the worker processes once. Each worker
+    searches one sieved window at a time (see
+    :py:func:`rsa.prime.search_random_window`), so there is never more than a
+    window of work left to wait for when a prime has been found or the pool is
+    closed.
+
+    Use it as a context manager to make sure the workers are shut down:
 
-        # Make sure it's odd
-        integer |= 1
+    >>> with PrimePool(2) as pool:
+    ...     p = pool.getprime(128)
+    >>> rsa.prime.is_prime(p)
+    True
 
-        # Test for primeness
-        if rsa.prime.is_prime(integer):
-            pipe.send(integer)
-            return
+    '''
+
+    def __init__(self, poolsize=None, progress=None):
+        '''Starts the worker processes.
+
+        :param poolsize: the number of processes to use, defaults to the number
+            of CPUs in the machine.
+        :param progress: optional callable, which is called without arguments
+            every time a worker has finished searching a window.
+        '''
+
+        if poolsize is None:
+            poolsize = mp.cpu_count()
+
+        if poolsize < 1:
+            raise ValueError('Pool size (%i) should be >= 1' % poolsize)
+
+        self.poolsize = poolsize
+        self.progress = progress
+        self._pool = mp.Pool(poolsize)
+
+        # Results of finished searches as (nbits, prime or None), put there
+        # by the pool's result handler thread
+        self._results = queue.Queue()
+        self._searches = []
+        self._running = collections.defaultdict(int)
+
+        # Primes that were found after the call that needed them returned
+        self._spare = collections.defaultdict(list)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
+
+    def getprime(self, nbits):
+        '''Returns a prime number that can be stored in 'nbits' bits.
+
+        Keeps every worker busy searching windows until one of them finds a
+        prime.
+        '''
+
+        return self.getprimes([nbits])[0]
+
+    def getprimes(self, sizes):
+        '''Returns a list with a prime number for each number of bits in
+        'sizes'.
+
+        All the primes are searched for at the same time, so the workers
+        that would otherwise wait for the slowest search keep looking for
+        the other primes. Searches still running when the last prime is
+        found are not wasted: later calls wait for them instead of starting
+        new ones, and keep the primes they find.
+
+        >>> with PrimePool(2) as pool:
+        ...     (p, q) = pool.getprimes([136, 120])
+        >>> from rsa import common
+        >>> common.bit_size(p), common.bit_size(q)
+        (136, 120)
+        >>> rsa.prime.is_prime(p) and rsa.prime.is_prime(q)
+        True
+
+        '''
+
+        primes = [None] * len(sizes)
+        wanted = []
+        for (index, nbits) in enumerate(sizes):
+            if self._spare[nbits]:
+                primes[index] = self._spare[nbits].pop()
+            else:
+                wanted.append(index)
+
+        while wanted:
+            # Keep every worker busy, searching for the size with the fewest
+            # searches running per prime still needed.
+            counts = collections.Counter(sizes[index] for index in wanted)
+            while sum(self._running.values()) < self.poolsize:
+                nbits = min(counts, key=lambda size:
+                            self._running[size] / float(counts[size]))
+                self._search(nbits)
+
+            (nbits, prime) = self._next_result()
+
+            if self.progress is not None:
+                self.progress()
+
+            if prime is None:
+                continue
+
+            for index in wanted:
+                if sizes[index] == nbits:
+                    primes[index] = prime
+                    wanted.remove(index)
+                    break
+            else:
+                if len(self._spare[nbits]) < self.poolsize:
+                    self._spare[nbits].append(prime)
+
+        return primes
+
+    def _search(self, nbits):
+        def found(prime):
+            self._results.put((nbits, prime))
+
+        self._check_searches()
+        self._running[nbits] += 1
+        self._searches.append((nbits, self._pool.apply_async(
+            rsa.prime.search_random_window, (nbits,), callback=found)))
+
+    def _next_result(self):
+        '''Waits for a search to finish, and returns (nbits, prime or None).'''
+
+        while True:
+            try:
+                (nbits, prime) = self._results.get(timeout=0.1)
+            except queue.Empty:
+                self._check_searches()
+            else:
+                self._running[nbits] -= 1
+                return (nbits, prime)
+
+    def _check_searches(self):
+        '''Forgets finished searches, and raises the exception of a failed
+        one. Failed searches don't call back, so nothing else notices them.
+        A failed search no longer counts as running, so the pool keeps
+        starting new ones if the caller carries on.
+        '''
+
+        searches = []
+        failed = None
+        for (nbits, result) in self._searches:
+            if not result.ready():
+                searches.append((nbits, result))
+            elif not result.successful():
+                self._running[nbits] -= 1
+                if failed is None:
+                    failed = result
+        self._searches = searches
+
+        if failed is not None:
+            failed.get()
+
+    def close(self):
+        '''Waits for the workers to finish their current window, and stops
+        them.'''
+
+        self._pool.close()
+        self._pool.join()
+
+    def terminate(self):
+        '''Stops the workers immediately.'''
+
+        self._pool.terminate()
+        self._pool.join()
 
 def getprime(nbits, poolsize):
     '''Returns a prime number that can be stored in 'nbits' bits.
 
-    Works in multiple threads at the same time.
+    Works in multiple processes at the same time. Use a :py:class:`PrimePool`
+    directly to find more than one prime with the same processes.
 
     >>> p = getprime(128, 3)
     >>> rsa.prime.is_prime(p-1)
@@ -62,20 +232,10 @@ def getprime(nbits, poolsize):
     
     '''
 
-    (pipe_recv, pipe_send) = mp.Pipe(duplex=False)
-
-    # Create processes
-    procs = [mp.Process(target=_find_prime, args=(nbits, pipe_send))
-             for _ in range(poolsize)]
-    [p.start() for p in procs]
-
-    result = pipe_recv.recv()
-
-    [p.terminate() for p in procs]
-
-    return result
+    with PrimePool(poolsize) as pool:
+        return pool.getprime(nbits)
 
-__all__ = ['getprime']
+__all__ = ['getprime', 'PrimePool']
 
     
 if __name__ == '__main__':
@@ -28,8 +28,11 @@ can be used to deduce where in the process the failure occurred. DO NOT PASS
 SUCH INFORMATION to your users.
 '''
 
+import binascii
 import hashlib
+import mmap
 import os
+import stat
 
 from rsa._compat import b
 from rsa import common, transform, core, varblock
@@ -51,6 +54,12 @@ HASH_METHODS = {
     'SHA-512': hashlib.sha512,
 }
 
+# File-like messages are read in blocks of this many bytes when hashing.
+HASH_BLOCK_SIZE = 64 * 1024
+
+# Files at least this large are memory-mapped instead of read when hashing.
+MMAP_THRESHOLD = 16 * 1024 * 1024
+
 class CryptoError(Exception):
     '''Base class for all exceptions in this module.'''
 
@@ -263,7 +272,7 @@ def sign(message, priv_key, hash):
     asn1code = HASH_ASN1[hash]
     
     # Calculate the hash
-    hash = _hash(message, hash)
+    hash = compute_hash(message, hash)
 
     # Encrypt the hash with the private key
     cleartext = asn1code + hash
@@ -303,6 +312,69 @@ def verify(message, signature, pub_key):
     decrypted = core.decrypt_int(encrypted, pub_key.e, pub_key.n)
     clearsig = transform.int2bytes(decrypted, blocksize)
 
+    _verify_clearsig(message, clearsig)
+    return True
+
+def verify_batch(signed, pub_key):
+    '''Verifies many signatures that were all made with the same key.
+
+    Performs the same checks as :py:func:`rsa.verify` on every (message,
+    signature) pair, but the key is only inspected once. The per-call type
+    checks of :py:func:`rsa.core.decrypt_int` are skipped, and each decrypted
+    block is converted to bytes in a single step. A regular file that is
+    opened for more than one pair is only hashed once per call.
+
+    :param signed: an iterable of ``(message, signature)`` tuples. Each
+        message can be an 8-bit string or a file-like object, as with
+        :py:func:`rsa.verify`.
+    :param pub_key: the :py:class:`rsa.PublicKey` of the person signing the
+        messages.
+    :returns: a list of booleans, ``True`` for each signature that matches its
+        message and ``False`` for each one that doesn't.
+
+    >>> from rsa import key
+    >>> (pub_key, priv_key) = key.newkeys(512)
+    >>> signed = [(b('hello'), sign(b('hello'), priv_key, 'SHA-1')),
+    ...           (b('world'), sign(b('hello'), priv_key, 'SHA-256'))]
+    >>> verify_batch(signed, pub_key)
+    [True, False]
+
+    '''
+
+    core.assert_int(pub_key.e, 'e')
+    core.assert_int(pub_key.n, 'n')
+
+    e = pub_key.e
+    n = pub_key.n
+    hex_format = '%%0%ix' % (common.byte_size(n) * 2)
+
+    # File digests are only shared within this call
+    digests = {}
+
+    results = []
+    for (message, signature) in signed:
+        decrypted = pow(transform.bytes2int(signature), e, n)
+        clearsig = binascii.unhexlify(b(hex_format % decrypted))
+        try:
+            _verify_clearsig(message, clearsig, digests)
+        except VerificationError:
+            results.append(False)
+        else:
+            results.append(True)
+
+    return results
+
+def _verify_clearsig(message, clearsig, digests=None):
+    '''Checks a decrypted signature block against the message.
+
+    :param message: the signed message, as passed to :py:func:`rsa.verify`.
+    :param clearsig: the signature block after decryption with the public key,
+        padded to the key size.
+    :param digests: passed on to :py:func:`compute_hash`.
+    :raise VerificationError: when the signature doesn't match the message.
+
+    '''
+
     # If we can't find the signature  marker, verification failed.
     if clearsig[0:2] != b('\x00\x01'):
         raise VerificationError('Verification failed')
@@ -315,23 +387,37 @@ def verify(message, signature, pub_key):
     
     # Get the hash and the hash method
     (method_name, signature_hash) = _find_method_hash(clearsig[sep_idx+1:])
-    message_hash = _hash(message, method_name)
+    message_hash = compute_hash(message, method_name, digests)
 
     # Compare the real hash to the hash in the signature
     if message_hash != signature_hash:
         raise VerificationError('Verification failed')
 
-    return True
-
-def _hash(message, method_name):
+def compute_hash(message, method_name, digests=None):
     '''Returns the message digest.
     
+    File-like messages are read in blocks of :py:const:`HASH_BLOCK_SIZE`
+    bytes, or mapped into memory when they are at least
+    :py:const:`MMAP_THRESHOLD` bytes.
+
+    Nothing is cached unless the caller passes a ``digests`` dict, which
+    should live no longer than the operation that needs it. The digest of a
+    regular file that is read from its start is then stored in it, keyed by
+    the file's device, inode, size, modification and change times, so the
+    same file is only hashed once.
+
     :param message: the signed message. Can be an 8-bit string or a file-like
         object. If ``message`` has a ``read()`` method, it is assumed to be a
         file-like object.
     :param method_name: the hash method, must be a key of
         :py:const:`HASH_METHODS`.
+    :param digests: a dict to look up and store file digests in, or None.
     
+    >>> import io
+    >>> digest = compute_hash(b('hello'), 'SHA-1')
+    >>> digest == compute_hash(io.BytesIO(b('hello')), 'SHA-1')
+    True
+
     '''
 
     if method_name not in HASH_METHODS:
@@ -340,15 +426,81 @@ def _hash(message, method_name):
     method = HASH_METHODS[method_name]
     hasher = method()
 
-    if hasattr(message, 'read') and hasattr(message.read, '__call__'):
-        # read as 1K blocks
-        for block in varblock.yield_fixedblocks(message, 1024):
-            hasher.update(block)
-    else:
+    if not (hasattr(message, 'read') and hasattr(message.read, '__call__')):
         # hash the message object itself.
         hasher.update(message)
+        return hasher.digest()
+
+    file_stat = _stat_unread_file(message)
+    if file_stat is None:
+        _hash_fileobj(hasher, message)
+        return hasher.digest()
+
+    if digests is None:
+        cache_key = None
+    else:
+        # st_mtime_ns is only there on Python 3
+        cache_key = (file_stat.st_dev, file_stat.st_ino, file_stat.st_size,
+                     getattr(file_stat, 'st_mtime_ns', file_stat.st_mtime),
+                     file_stat.st_ctime, method_name)
+        if cache_key in digests:
+            # Leave the file at its end, as if it had been read.
+            message.seek(0, 2)
+            return digests[cache_key]
+
+    if file_stat.st_size >= MMAP_THRESHOLD:
+        _hash_mmap(hasher, message)
+        # Leave the file at its end, as if it had been read.
+        message.seek(0, 2)
+    else:
+        _hash_fileobj(hasher, message)
+
+    digest = hasher.digest()
+    if cache_key is not None:
+        digests[cache_key] = digest
+    return digest
+
+def _stat_unread_file(fileobj):
+    '''Returns the os.stat() result for a regular file that hasn't been read
+    from yet, or None for any other file-like object.'''
 
-    return hasher.digest()
+    try:
+        if fileobj.tell() != 0:
+            return None
+        file_stat = os.fstat(fileobj.fileno())
+    except (AttributeError, EnvironmentError, ValueError):
+        return None
+
+    if not stat.S_ISREG(file_stat.st_mode):
+        return None
+
+    return file_stat
+
+def _hash_fileobj(hasher, fileobj):
+    '''Feeds the rest of the file into the hasher, one block at a time.'''
+
+    if not hasattr(fileobj, 'readinto'):
+        for block in varblock.yield_fixedblocks(fileobj, HASH_BLOCK_SIZE):
+            hasher.update(block)
+        return
+
+    # Reuse a single buffer for all the blocks.
+    buf = bytearray(HASH_BLOCK_SIZE)
+    view = memoryview(buf)
+    while True:
+        read_bytes = fileobj.readinto(buf)
+        if not read_bytes:
+            break
+        hasher.update(view[:read_bytes])
+
+def _hash_mmap(hasher, fileobj):
+    '''Feeds the whole file into the hasher through a memory map.'''
+
+    mapped = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        hasher.update(mapped)
+    finally:
+        mapped.close()
 
 
 def _find_method_hash(method_hash):
@@ -373,8 +525,8 @@ def _find_method_hash(method_hash):
     raise VerificationError('Verification failed')
 
 
-__all__ = ['encrypt', 'decrypt', 'sign', 'verify',
-           'DecryptionError', 'VerificationError', 'CryptoError']
+__all__ = ['encrypt', 'decrypt', 'sign', 'verify', 'verify_batch',
+           'compute_hash', 'DecryptionError', 'VerificationError', 'CryptoError']
 
 if __name__ == '__main__':
     print('Running doctests 1000x or until failure')
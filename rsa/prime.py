@@ -108,9 +108,63 @@ def is_prime(number):
 
     return randomized_primality_testing(number, 6)
 
+def _small_primes(limit):
+    '''Returns a list of the odd primes below 'limit'.
+
+    >>> _small_primes(20)
+    [3, 5, 7, 11, 13, 17, 19]
+    '''
+
+    sieve = bytearray([1]) * limit
+    sieve[0:2] = bytearray(2)
+    for p in range(2, int(limit ** 0.5) + 1):
+        if sieve[p]:
+            sieve[p * p::p] = bytearray((limit - p * p - 1) // p + 1)
+    return [p for p in range(3, limit) if sieve[p]]
+
+# Candidates divisible by one of these are rejected before any of the
+# expensive primality tests are done on them.
+SMALL_PRIMES = _small_primes(2000)
+
+def sieve_window(start, size):
+    '''Yields the odd numbers start, start + 2, ... start + 2 * (size - 1)
+    that have no factor in :py:const:`SMALL_PRIMES`.
+
+    Each small prime is only divided into 'start' once; its multiples in the
+    window are then crossed off by stepping through a bytearray.
+
+    :param start: the odd number to start the window at.
+    :param size: the number of odd numbers in the window.
+
+    >>> list(sieve_window(2001, 10))
+    [2003, 2011, 2017]
+    '''
+
+    assert start & 1
+
+    sieve = bytearray([1]) * size
+    for p in SMALL_PRIMES:
+        # Don't cross off the small prime itself.
+        if p >= start:
+            break
+
+        # start + 2i is divisible by p when i == -start / 2 (mod p)
+        first = ((p - start % p) * ((p + 1) // 2)) % p
+        if first < size:
+            sieve[first::p] = bytearray((size - first - 1) // p + 1)
+
+    for (index, keep) in enumerate(sieve):
+        if keep:
+            yield start + 2 * index
+
 def getprime(nbits):
     '''Returns a prime number that can be stored in 'nbits' bits.
 
+    A random odd number is picked, and the window of odd numbers following it
+    is sieved with :py:const:`SMALL_PRIMES`. Only the survivors are tested
+    with :py:func:`is_prime`. When the window runs out, a new random start is
+    picked.
+
     >>> p = getprime(128)
     >>> is_prime(p-1)
     False
@@ -126,16 +180,41 @@ def getprime(nbits):
     '''
 
     while True:
-        integer = rsa.randnum.read_random_int(nbits)
+        prime = search_random_window(nbits)
+        if prime is not None:
+            return prime
+
+        # Retry with a new window if no prime was found
+
+def search_random_window(nbits):
+    '''Searches one sieved window at a random 'nbits'-bit start for a prime.
+
+    This is a single, bounded step of :py:func:`getprime`, so that it can be
+    handed out to worker processes by :py:mod:`rsa.parallel`.
 
-        # Make sure it's odd
-        integer |= 1
+    :returns: a prime number that can be stored in 'nbits' bits, or None when
+        the window doesn't contain one.
+    '''
+
+    # Roughly 1 in (nbits * ln(2) / 2) odd numbers of nbits bits is prime, so
+    # this window will usually contain several.
+    window_size = max(nbits * 2, 64)
+
+    integer = rsa.randnum.read_random_int(nbits)
+
+    # Make sure it's odd
+    integer |= 1
+
+    for candidate in sieve_window(integer, window_size):
+        # Stepping through the window may overflow into nbits + 1 bits.
+        if candidate >> nbits:
+            break
 
         # Test for primeness
-        if is_prime(integer):
-            return integer
+        if is_prime(candidate):
+            return candidate
 
-        # Retry if not prime
+    return None
 
 
 def are_relatively_prime(a, b):
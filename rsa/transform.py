@@ -31,9 +31,29 @@ except ImportError:
     pass
 
 import binascii
-from struct import pack
 from rsa import common
-from rsa._compat import is_integer, b, byte, get_word_alignment, ZERO_BYTE, EMPTY_BYTE
+from rsa._compat import is_integer, byte, ZERO_BYTE, EMPTY_BYTE
+
+
+if hasattr(int, 'from_bytes'):
+    # Python 3.2+ converts natively. Empty input is still refused, just like
+    # int('', 16) refuses it on older Pythons.
+    def _bytes2int(raw_bytes):
+        if not raw_bytes:
+            raise ValueError('Cannot convert an empty byte string')
+        return int.from_bytes(raw_bytes, 'big')
+
+    def _int2bytes_raw(number):
+        return number.to_bytes(max(1, (number.bit_length() + 7) // 8), 'big')
+else:
+    def _bytes2int(raw_bytes):
+        return int(binascii.hexlify(raw_bytes), 16)
+
+    def _int2bytes_raw(number):
+        hex_num = '%x' % number
+        if len(hex_num) & 1:
+            hex_num = '0' + hex_num
+        return binascii.unhexlify(hex_num)
 
 
 def bytes2int(raw_bytes):
@@ -48,7 +68,7 @@ def bytes2int(raw_bytes):
 
     '''
 
-    return int(binascii.hexlify(raw_bytes), 16)
+    return _bytes2int(raw_bytes)
 
 
 def _int2bytes(number, block_size=None):
@@ -182,21 +202,9 @@ def int2bytes(number, fill_size=None, chunk_size=None, overflow=False):
     # Ensure these are integers.
     number & 1
 
-    raw_bytes = b('')
-
-    # Pack the integer one machine word at a time into bytes.
-    num = number
-    word_bits, _, max_uint, pack_type = get_word_alignment(num)
-    pack_format = ">%s" % pack_type
-    while num > 0:
-        raw_bytes = pack(pack_format, num & max_uint) + raw_bytes
-        num >>= word_bits
-    # Obtain the index of the first non-zero byte.
-    zero_leading = bytes_leading(raw_bytes)
-    if number == 0:
-        raw_bytes = ZERO_BYTE
-    # De-padding.
-    raw_bytes = raw_bytes[zero_leading:]
+    # Convert the whole number in one step; this never yields leading zeros,
+    # except for a single zero byte when the number is zero.
+    raw_bytes = _int2bytes_raw(number)
 
     length = len(raw_bytes)
     if fill_size and fill_size > 0:
@@ -31,14 +31,21 @@ The VARBLOCK file format is as follows, where || denotes byte concatenation:
 This file format is called the VARBLOCK format, in line with the varint format
 used to denote the block sizes.
 
+Reading a VARBLOCK file goes through a :py:class:`VarblockReader`, which reads
+the file in large chunks and decodes the varints from memory, instead of
+reading every varint byte and every block separately.
+
 '''
 
-from rsa._compat import byte, b
+from rsa._compat import b
 
 
 ZERO_BYTE = b('\x00')
 VARBLOCK_VERSION = 1
 
+# Number of bytes read from the input file at a time
+BUFFER_SIZE = 64 * 1024
+
 def read_varint(infile):
     '''Reads a varint from the file.
 
@@ -71,22 +78,24 @@ def read_varint(infile):
             return (varint, read_bytes)
 
 
-def write_varint(outfile, value):
-    '''Writes a varint to a file.
+def encode_varint(value):
+    '''Encodes a varint.
 
-    @param outfile: the file-like object to write to. It should have a write()
-        method.
-    @returns the number of written bytes.
+    >>> encode_varint(0) == ZERO_BYTE
+    True
+    >>> encode_varint(300) == b('\\xac\\x02')
+    True
+
+    @returns the varint as bytes.
     '''
 
     # there is a big difference between 'write the value 0' (this case) and
     # 'there is nothing left to write' (the false-case of the while loop)
 
     if value == 0:
-        outfile.write(ZERO_BYTE)
-        return 1
+        return ZERO_BYTE
 
-    written_bytes = 0
+    encoded = bytearray()
     while value > 0:
         to_write = value & 0x7f
         value = value >> 7
@@ -94,10 +103,195 @@ def write_varint(outfile, value):
         if value > 0:
             to_write |= 0x80
 
-        outfile.write(byte(to_write))
-        written_bytes += 1
+        encoded.append(to_write)
+
+    return bytes(encoded)
 
-    return written_bytes
+
+def write_varint(outfile, value):
+    '''Writes a varint to a file.
+
+    @param outfile: the file-like object to write to. It should have a write()
+        method.
+    @returns the number of written bytes.
+    '''
+
+    encoded = encode_varint(value)
+    outfile.write(encoded)
+
+    return len(encoded)
+
+
+def write_varblocks(outfile, blocks):
+    '''Writes blocks, each preceded by its varint-encoded length, to a file.
+
+    All blocks are written with a single write() call.
+
+    @param outfile: the file-like object to write to. It should have a write()
+        method.
+    @param blocks: sequence of blocks to write.
+    @returns the number of written bytes.
+    '''
+
+    chunks = []
+    for block in blocks:
+        chunks.append(encode_varint(len(block)))
+        chunks.append(block)
+
+    data = b('').join(chunks)
+    outfile.write(data)
+
+    return len(data)
+
+
+class VarblockReader(object):
+    '''Buffered reader of the VARBLOCK format.
+
+    Reads the input in chunks of at least ``buffer_size`` bytes, and decodes
+    varints and blocks from memory.
+
+    >>> from io import BytesIO
+    >>> reader = VarblockReader(BytesIO(b('\\x01\\x02ab\\x00\\x01c')))
+    >>> reader.read_version()
+    1
+    >>> [block.tobytes() for block in reader.iter_blocks()] == [b('ab'), b(''), b('c')]
+    True
+
+    '''
+
+    def __init__(self, infile, buffer_size=BUFFER_SIZE):
+        self.infile = infile
+        self.buffer_size = buffer_size
+        self._buffer = bytearray()
+        self._pos = 0
+
+    def _fill(self, size):
+        '''Makes sure at least 'size' unread bytes are in the buffer, unless
+        EOF is reached first.
+
+        The buffer is replaced rather than resized, so memoryviews of earlier
+        blocks stay valid.
+
+        @returns the number of unread bytes in the buffer.
+        '''
+
+        available = len(self._buffer) - self._pos
+        if available >= size:
+            return available
+
+        chunks = [self._buffer[self._pos:]]
+        while available < size:
+            chunk = self.infile.read(max(self.buffer_size, size - available))
+            if not chunk:
+                break
+            chunks.append(bytearray(chunk))
+            available += len(chunk)
+
+        self._buffer = bytearray().join(chunks)
+        self._pos = 0
+        return available
+
+    def read_version(self):
+        '''Reads the VARBLOCK version number.'''
+
+        if not self._fill(1):
+            raise EOFError('Unable to read VARBLOCK version number')
+
+        version = self._buffer[self._pos]
+        self._pos += 1
+        return version
+
+    def read_varint(self):
+        '''Reads a varint, see :py:func:`read_varint`.
+
+        @returns (varint, length), the read varint and the number of read bytes.
+        '''
+
+        # Fast path: the whole varint is in the buffer already
+        buffer = self._buffer
+        pos = self._pos
+        varint = 0
+        shift = 0
+        while pos < len(buffer):
+            byte = buffer[pos]
+            pos += 1
+            varint |= (byte & 0x7F) << shift
+            if not byte & 0x80:
+                read_bytes = pos - self._pos
+                self._pos = pos
+                return (varint, read_bytes)
+            shift += 7
+
+        varint = 0
+        read_bytes = 0
+
+        while True:
+            if self._pos == len(self._buffer) and not self._fill(1):
+                if read_bytes == 0:
+                    return (0, 0)
+                raise EOFError('EOF while reading varint, value is %i so far' %
+                               varint)
+
+            byte = self._buffer[self._pos]
+            self._pos += 1
+            varint += (byte & 0x7F) << (7 * read_bytes)
+
+            read_bytes += 1
+
+            if not byte & 0x80:
+                return (varint, read_bytes)
+
+    def _iter_offsets(self):
+        '''Generator, reads each remaining block into the buffer.
+
+        @yields the (start, end) offsets of the block in the buffer, which is
+            only valid until the next block is read.
+        '''
+
+        while True:
+            # Decode the varint straight from the buffer, or have read_varint()
+            # refill the buffer if it runs out before the end of the varint.
+            buffer = self._buffer
+            pos = self._pos
+            block_size = 0
+            shift = 0
+            while pos < len(buffer):
+                byte = buffer[pos]
+                pos += 1
+                block_size |= (byte & 0x7F) << shift
+                if not byte & 0x80:
+                    break
+                shift += 7
+            else:
+                (block_size, read_bytes) = self.read_varint()
+
+                # EOF at block boundary, that's fine.
+                if read_bytes == 0 and block_size == 0:
+                    return
+
+                pos = self._pos
+
+            end = pos + block_size
+            if end > len(self._buffer):
+                self._pos = pos
+                read_size = min(self._fill(block_size), block_size)
+                if read_size != block_size:
+                    raise EOFError('Block size is %i, but could read only %i '
+                                   'bytes' % (block_size, read_size))
+                pos = 0
+                end = block_size
+
+            self._pos = end
+            yield (pos, end)
+
+    def iter_blocks(self):
+        '''Generator, yields a memoryview of each remaining block.
+
+        The views don't copy the blocks out of the buffer.
+        '''
+
+        for (start, end) in self._iter_offsets():
+            yield memoryview(self._buffer)[start:end]
 
 
 def yield_varblocks(infile):
@@ -108,48 +302,42 @@ def yield_varblocks(infile):
     @yields the contents of each block.
     '''
 
-    # Check the version number
-    first_char = infile.read(1)
-    if len(first_char) == 0:
-        raise EOFError('Unable to read VARBLOCK version number')
+    reader = VarblockReader(infile)
 
-    version = ord(first_char)
+    # Check the version number
+    version = reader.read_version()
     if version != VARBLOCK_VERSION:
         raise ValueError('VARBLOCK version %i not supported' % version)
 
-    while True:
-        (block_size, read_bytes) = read_varint(infile)
-
-        # EOF at block boundary, that's fine.
-        if read_bytes == 0 and block_size == 0:
-            break
-
-        block = infile.read(block_size)
-
-        read_size = len(block)
-        if read_size != block_size:
-            raise EOFError('Block size is %i, but could read only %i bytes' %
-                           (block_size, read_size))
-
-        yield block
+    for (start, end) in reader._iter_offsets():
+        yield bytes(reader._buffer[start:end])
 
 
 def yield_fixedblocks(infile, blocksize):
     '''Generator, yields each block of ``blocksize`` bytes in the input file.
 
+    The file is read in chunks of about :py:data:`BUFFER_SIZE` bytes. Only
+    the last block can be shorter than ``blocksize``.
+
     :param infile: file to read and separate in blocks.
     :returns: a generator that yields the contents of each block
     '''
 
-    while True:
-        block = infile.read(blocksize)
+    chunk_size = max(1, BUFFER_SIZE // blocksize) * blocksize
+    pending = b('')
 
-        read_bytes = len(block)
-        if read_bytes == 0:
+    while True:
+        chunk = infile.read(chunk_size - len(pending))
+        if not chunk:
             break
 
-        yield block
+        pending += chunk
+        if len(pending) < chunk_size:
+            continue
 
-        if read_bytes < blocksize:
-            break
+        for offset in range(0, chunk_size, blocksize):
+            yield pending[offset:offset + blocksize]
+        pending = b('')
 
+    for offset in range(0, len(pending), blocksize):
+        yield pending[offset:offset + blocksize]
@@ -0,0 +1,78 @@
+'''Checks rsa.aesctr against the block cipher of the aes module.
+
+rsa.aesctr has its own AES implementation, because the rsa package can't
+depend on the modules next to it. Its key stream must be the AES encryption
+of the successive counter values, as computed by aes.AES.
+
+Run from the repository root with Python 2, which the aes module needs:
+``python -m unittest discover tests``.
+'''
+
+import binascii
+import os
+import random
+import unittest
+
+import aes
+from rsa.aesctr import AESCounterMode, COUNTER_MASK
+
+
+def reference_key_stream(key, iv, offset, blocks):
+    '''Returns the CTR key stream from aes.AES, one block at a time.'''
+
+    cipher = aes.AES()
+    key_bytes = list(bytearray(key))
+    counter = int(binascii.hexlify(iv), 16) + offset
+    stream = bytearray()
+    for i in range(blocks):
+        value = (counter + i) & COUNTER_MASK
+        block = list(bytearray(binascii.unhexlify('%032x' % value)))
+        stream.extend(cipher.encrypt(block, key_bytes, len(key)))
+    return bytes(stream)
+
+
+class AESCounterModeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.random = random.Random(2011)
+
+    def random_bytes(self, size):
+        return bytes(bytearray(self.random.getrandbits(8)
+                               for _ in range(size)))
+
+    def test_key_stream(self):
+        for key_size in (16, 24, 32):
+            for _ in range(5):
+                key = self.random_bytes(key_size)
+                iv = self.random_bytes(16)
+                offset = self.random.randrange(1000)
+                ctr = AESCounterMode(key, iv, offset)
+                self.assertEqual(ctr.crypt(b'\x00' * 48),
+                                 reference_key_stream(key, iv, offset, 3))
+
+    def test_counter_wraps(self):
+        key = self.random_bytes(32)
+        iv = b'\xff' * 15 + b'\xfe'
+        ctr = AESCounterMode(key, iv)
+        self.assertEqual(ctr.crypt(b'\x00' * 64),
+                         reference_key_stream(key, iv, 0, 4))
+
+    def test_split_calls(self):
+        key = self.random_bytes(16)
+        iv = self.random_bytes(16)
+        data = os.urandom(1000)
+        whole = AESCounterMode(key, iv).crypt(data)
+
+        ctr = AESCounterMode(key, iv)
+        parts = []
+        start = 0
+        while start < len(data):
+            end = start + self.random.randrange(1, 100)
+            parts.append(ctr.crypt(data[start:end]))
+            start = end
+        self.assertEqual(b''.join(parts), whole)
+        self.assertEqual(AESCounterMode(key, iv).crypt(whole), data)
+
+
+if __name__ == '__main__':
+    unittest.main()
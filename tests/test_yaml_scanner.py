@@ -0,0 +1,143 @@
+'''Differential test of yaml.scan() against the original PyYAML scanner.
+
+The scanner consumes runs of characters with regular expressions, and keeps
+marks as buffer offsets until they are handed out. Neither may change the
+tokens: every token must have the same type, value, style and marks (index,
+line, column and snippet) as the one from tests/yaml_reference, and errors
+must have the same message.
+
+The inputs are the requirement files of this repository, documents written
+by yaml.dump(), hand-written edge cases, and random fragments of YAML syntax.
+
+Run from the repository root with Python 2, which the yaml package needs:
+``python -m unittest discover tests``.
+'''
+
+import codecs
+import glob
+import io
+import os
+import random
+import unittest
+
+import yaml
+from yaml_reference import ReferenceScanner
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+EDGE_CASES = [
+    u"\ufeff%YAML 1.1\n---\nkey: value\n? complex\n: [a, {b: c}, !!str 3]\n"
+    u"anchor: &a [1, 2]\nalias: *a\nlit: |+\n  keep\n\n\nfold: >-\n  folded\n"
+    u"  text\n\n  para\nsq: 'it''s'\ndq: \"esc \\t \\u263a \\x41 \\\n  cont\"\n"
+    u"plain: a b\n  c d\n...\n",
+    "a: 1\r\nb:\r\n  - x\r\n  - y\r\nc: |\r\n  t1\r\n  t2\r\n",
+    "a: 1\rb: 2\r",
+    u"caf\xe9: na\xefve\n\u2029x: 1\n".encode('utf-8'),
+    codecs.BOM_UTF16_LE + u"a: [1, 2]\nb: c\n".encode('utf-16-le'),
+    codecs.BOM_UTF16_BE + u"a: [1, 2]\nb: c\n".encode('utf-16-be'),
+    u"tag: !foo\n  x: y\nlong: " + u"w" * 200 + u"\n",
+    "text: |2\n   indented\n  less\nnext: >\n\n  folded\n   more\n\n  back\n",
+    "- a # comment\n-\tb\n- 'x\n\n  y'\n- \"x\n\n  y\"\n- plain\n\n  continued\n",
+    # errors
+    "a: [1, 2\n", "a: b: c\n", "- a\nb: c\n", "a: 'unterminated\n",
+    "a: \"bad \\q\"\n", "\x01bad", "a: \xff\xfe", "  a: 1\n b: 2\n",
+    "key: @x\n", "{a: 1\n", "x: |\n  ok\n bad: 1\n", "a: |0\n x\n",
+    "a:\r\n  b: 1\r\n c: 2\r\n",
+]
+
+FRAGMENTS = [
+    u'k: |\n  t\n', u'k: >\n  t\n\n  u\n', u'\n- ', u'\nk: ', u'  text more',
+    u'a: b\n', u' ', u'  ', u'\n', u'\r\n', u'\r', u'\t', u'a', u'key',
+    u'x y', u':', u': ', u'- ', u'-', u'?', u'? ', u',', u'[', u']', u'{',
+    u'}', u'#', u' #c', u'"', u"'", u"''", u'\\', u'\\n', u'\\x4', u'\\x41',
+    u'|', u'|-', u'|+', u'>', u'>2', u'|1', u'---', u'...', u'&a', u'*a',
+    u'!t', u'!!str', u'%', u'\x85', u'\xe9', u'\ufeff', u'\u2028',
+    u'\n  ', u'\n    ', u'1', u'0.5',
+]
+
+
+def corpus():
+    documents = []
+    names = glob.glob(os.path.join(ROOT, 'Requirements', '*', '*.y'))
+    names += glob.glob(os.path.join(ROOT, 'Requirements', '*', '*', '*.y'))
+    names.append(os.path.join(ROOT, 'Qwerkfile'))
+    for name in sorted(names):
+        with open(name, 'rb') as f:
+            documents.append(f.read())
+    documents.append(yaml.dump({'items': [
+        {'name': 'n%d' % i, 'count': i, 'ok': True, 'ratio': i / 3.0,
+         'tags': ['a', 'b', 'yes'], 'when': None,
+         'text': 'line one\nline two  \n\n  indented %d\n' % i}
+        for i in range(100)]}, default_flow_style=False))
+    documents.append(yaml.dump({'items': [
+        {'name': u'n\xe9%d' % i, 'v': [1, 2.5, None, u'\u2028x']}
+        for i in range(20)]}, allow_unicode=True))
+    documents.append(yaml.dump({'x': [1, 2, {'y': 'z'}]},
+                               default_flow_style=True))
+    documents.append(yaml.dump_all([{'a': 1}, [1, 2], 'scalar', None],
+                                   explicit_start=True, explicit_end=True))
+    return documents + EDGE_CASES
+
+
+def fragments(count, seed):
+    rng = random.Random(seed)
+    return [u''.join(rng.choice(FRAGMENTS)
+                     for _ in range(rng.randint(1, 40)))
+            for _ in range(count)]
+
+
+def describe_mark(mark):
+    if mark is None:
+        return None
+    return (mark.name, mark.index, mark.line, mark.column, str(mark))
+
+
+def describe_tokens(tokens):
+    '''Returns everything about the tokens that the scanners must agree on,
+    ending with the error, if there was one.'''
+
+    result = []
+    try:
+        for token in tokens:
+            attributes = sorted((key, value)
+                                for (key, value) in token.__dict__.items()
+                                if not key.endswith('_mark'))
+            result.append((type(token).__name__, attributes,
+                           describe_mark(token.start_mark),
+                           describe_mark(token.end_mark)))
+    except Exception as exc:
+        result.append((type(exc).__name__, str(exc)))
+    return result
+
+
+def reference_tokens(stream):
+    scanner = ReferenceScanner(stream)
+    while scanner.check_token():
+        yield scanner.get_token()
+
+
+def as_stream(document):
+    if isinstance(document, unicode):
+        return io.StringIO(document)
+    return io.BytesIO(document)
+
+
+class ScannerDifferentialTest(unittest.TestCase):
+
+    def assertSameTokens(self, document):
+        for make_input in (lambda: document, lambda: as_stream(document)):
+            expected = describe_tokens(reference_tokens(make_input()))
+            actual = describe_tokens(yaml.scan(make_input()))
+            self.assertEqual(actual, expected, repr(document))
+
+    def test_corpus(self):
+        for document in corpus():
+            self.assertSameTokens(document)
+
+    def test_random_fragments(self):
+        for document in fragments(2000, 44):
+            self.assertSameTokens(document)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,16 @@
+'''The reader and scanner of PyYAML 3.11, copied unchanged from before the
+scanner used regular expressions and kept marks as offsets.
+
+test_yaml_scanner.py compares the tokens of yaml.scan() with the tokens
+of ReferenceScanner.
+'''
+
+from reader import Reader
+from scanner import Scanner
+
+
+class ReferenceScanner(Reader, Scanner):
+
+    def __init__(self, stream):
+        Reader.__init__(self, stream)
+        Scanner.__init__(self)
@@ -1,7 +1,10 @@
 import rsa
+import rsa.parallel
 import aes
+import binascii
 import getpass
-import hashlib
+import multiprocessing
+import sys
 from base64 import b64encode, b64decode
 from pbkdf2 import PBKDF2
 import yaml
@@ -25,10 +28,8 @@ def hash_file(filename):
     '''
     Take a hash of a file's contents.
     '''
-    h = hashlib.new("sha1")
-    with open(filename, 'r') as f:
-        h.update(f.read())
-    return h.hexdigest()
+    with open(filename, 'rb') as f:
+        return binascii.hexlify(rsa.pkcs1.compute_hash(f, 'SHA-1'))
 
 def aes_key(password):
     '''
@@ -85,9 +86,38 @@ def write_identity(privkey, pubkey, first, last, password):
         exit()
     
     with open(qwerkid, 'w') as f:
-        yaml.dump(to_write, f)
+        yaml.dump(to_write, f, no_aliases=True)
     
-def new_identity():
+def default_keygen_processes():
+    '''
+    Number of processes to generate keys with by default. On Windows the
+    worker processes would need to re-import the extensionless `qwerk`
+    script, which multiprocessing can't do, so stay in one process there.
+    '''
+    if sys.platform == 'win32':
+        return 1
+    return multiprocessing.cpu_count()
+
+def print_keygen_progress():
+    '''
+    Print a dot for each window of prime candidates searched.
+    '''
+    sys.stdout.write(".")
+    sys.stdout.flush()
+
+def generate_keys(processes):
+    '''
+    Generate a 2048 bit key pair, searching for primes in the given number
+    of processes.
+    '''
+    if processes > 1:
+        with rsa.parallel.PrimePool(processes, print_keygen_progress) as pool:
+            keys = rsa.newkeys(2048, pool=pool)
+        print("")
+        return keys
+    return rsa.newkeys(2048)
+
+def new_identity(processes=None):
     '''
     Create a new .qwerk.user file.
     '''
@@ -101,8 +131,10 @@ def new_identity():
         if not first_pass == second_pass:
             print("Passwords do not match, please try again.")
     
-    print("Generating keys. This is in python, so it may take a minute.")
-    (pubkey, privkey) = rsa.newkeys(2048)
+    if processes is None:
+        processes = default_keygen_processes()
+    print("Generating keys using {0} process(es).".format(processes))
+    (pubkey, privkey) = generate_keys(processes)
     write_identity(privkey, pubkey, first, last, first_pass)
 
 def verify_file_signature(filename, b64_sig, pubkey):
@@ -110,13 +142,19 @@ def verify_file_signature(filename, b64_sig, pubkey):
     Verify the signature of a file.
     '''
     with open(filename, 'r') as f:
-        try:
-            rsa.verify(f, b64decode(b64_sig), pubkey)
-            return True
-        except:
-            return False
+        return verify_signature(f, b64_sig, pubkey)
     return False
 
+def verify_signature(message, b64_sig, pubkey):
+    '''
+    Verify the signature of a string or open file.
+    '''
+    try:
+        rsa.verify(message, b64decode(b64_sig), pubkey)
+        return True
+    except:
+        return False
+
 def get_pubkey(reqdir, user_name):
     '''
     Get the public key for the given user.
@@ -126,6 +164,17 @@ def get_pubkey(reqdir, user_name):
         y = yaml.load(f)
         return decode_pubkey(y['public_key'])
 
+def read_pubkeys(reqdir):
+    '''
+    Read the encoded public keys of every user who joined the project.
+    '''
+    pubkeys = {}
+    for filename in glob.glob(os.path.join(reqdir, ".users", "*")):
+        with open(filename, 'r') as f:
+            y = yaml.extract(f, ('public_key',))
+            pubkeys[os.path.basename(filename)] = y['public_key']
+    return pubkeys
+
 def join_project(reqdir):
     '''
     Copy public credentials into the current project.
@@ -139,7 +188,7 @@ def join_project(reqdir):
         print("You've already joined this project.")
         exit()
     with open(pubfile, 'w') as f:
-        yaml.dump(qwerkid, f)
+        yaml.dump(qwerkid, f, no_aliases=True)
 
 def sig_file_name(reqdir, req_name, sig_type):
     '''
@@ -166,19 +215,53 @@ def check_sig(reqdir, sigfile, reqfile):
     '''
     sigy = None
     with open(sigfile, 'r') as f:
-        sigy = yaml.load(f)
+        sigy = yaml.extract(f, ('user', 'signature'))
     username = sigy['user']
     pubkey = get_pubkey(reqdir, username)
     return (verify_file_signature(reqfile, sigy['signature'], pubkey), username)
+
+def read_sigs(reqdir, req_name):
+    '''
+    Read all signature files for the given requirement name, keyed by
+    signature type.
+    '''
+    sigs = {}
+    for s in glob.glob(os.path.join(reqdir, ".sig", req_name + "_*")):
+        with open(s, 'r') as f:
+            sigs[s[s.rfind("_")+1:]] = yaml.extract(f, ('user', 'signature'))
+    return sigs
+
+def check_bundled_sig(state, req, sig_type):
+    '''
+    Check a signature that was loaded from a bundle against the
+    requirement source carried with it.
+    '''
+    sig = req.signatures[sig_type]
+    pubkey = decode_pubkey(state.pubkeys[sig['user']])
+    return (verify_signature(req.source, sig['signature'], pubkey), sig['user'])
+
+def iter_sig_checks(state, req_name):
+    '''
+    Check all signatures of the given requirement name, yielding
+    (signature name, type, validity, user name) for each.
+    '''
+    req = state.requirements[req_name]
+    if req.signatures is not None:
+        for sig_type in sorted(req.signatures.keys()):
+            sig_check = check_bundled_sig(state, req, sig_type)
+            yield ("{0}_{1}".format(req_name, sig_type), sig_type) + sig_check
+        return
+    for s in glob.glob(os.path.join(state.root, ".sig", req_name + "_*")):
+        sig_check = check_sig(state.root, s, req.file)
+        yield (s, s[s.rfind("_")+1:]) + sig_check
     
 def check_sigs(state, req_name):
     '''
     Check all signatures found for the given requirement name.
     '''
-    signatures = glob.glob(os.path.join(state.root, ".sig", req_name + "_*"))
     allPassed = True
-    for s in signatures:
-        if not check_sig(state.root, s, state.requirements[req_name].file)[0]:
+    for s, sig_type, valid, username in iter_sig_checks(state, req_name):
+        if not valid:
             print("Signature failed: " + s)
             allPassed = False
     
@@ -188,29 +271,35 @@ def get_signoffs(state, req_name):
     '''
     Get all signoffs as first,last,type
     '''
-    signatures = glob.glob(os.path.join(state.root, ".sig", req_name + "_*"))
     signoffs = []
-    for s in signatures:
-        sig_type = s[s.rfind("_")+1:]
-        sig_check = check_sig(state.root, s, state.requirements[req_name].file)
-        if not sig_check[0]:
+    for s, sig_type, valid, username in iter_sig_checks(state, req_name):
+        if not valid:
             print("Invalid signature {0}, continuing.".format(s))
             continue
-        namesplit = sig_check[1].split("_")
+        namesplit = username.split("_")
         signoffs.append((namesplit[0], namesplit[1], sig_type))
     return signoffs
+
+def check_req_sig_type(state, req, sig_type):
+    '''
+    Check a particular signature of a requirement, whether it was loaded
+    from a requirements directory or a bundle.
+    '''
+    if req.signatures is not None:
+        return sig_type in req.signatures and check_bundled_sig(state, req, sig_type)[0]
+    return check_sig_type(state.root, req, sig_type)
     
 def is_completed(req, state):
     '''
     Check the _completed signature file.
     '''
-    return check_sig_type(state.root, req, "completed")
+    return check_req_sig_type(state, req, "completed")
 
 def is_reviewed(req, state):
     '''
     Check the _reviewed signature file.
     '''
-    return check_sig_type(state.root, req, "reviewed")
+    return check_req_sig_type(state, req, "reviewed")
 
 def move_req_from_backlog(state, req_name):
     '''
@@ -264,6 +353,6 @@ class Authority(object):
         sig['signature'] = filesig
         sig['user'] = "{0}_{1}".format(self.first_name, self.last_name)
         with open(sigfile, 'w') as f:
-            yaml.dump(sig, f)
+            yaml.dump(sig, f, no_aliases=True)
         if sign_type == 'reviewed' and requirement.is_backlog():
             move_req_from_backlog(state, req_name)
@@ -16,6 +16,37 @@ try:
 except ImportError:
     __with_libyaml__ = False
 
+# Inside the loader, tokens, events and nodes keep their marks as offsets
+# into the reader's buffer.  The ones handed out by scan, parse and compose
+# get `Mark` objects instead.
+
+def _materialize_marks(loader, item):
+    if isinstance(item.start_mark, int):
+        item.start_mark = loader.get_mark(item.start_mark)
+    if isinstance(item.end_mark, int):
+        item.end_mark = loader.get_mark(item.end_mark)
+    return item
+
+def _materialize_node_marks(loader, node):
+    # Nodes may be shared by aliases, or even be recursive.
+    if node is None:
+        return node
+    visited = set()
+    pending = [node]
+    while pending:
+        item = pending.pop()
+        if id(item) in visited:
+            continue
+        visited.add(id(item))
+        _materialize_marks(loader, item)
+        if isinstance(item, SequenceNode):
+            pending.extend(item.value)
+        elif isinstance(item, MappingNode):
+            for key, value in item.value:
+                pending.append(key)
+                pending.append(value)
+    return node
+
 def scan(stream, Loader=Loader):
     """
     Scan a YAML stream and produce scanning tokens.
@@ -23,7 +54,7 @@ def scan(stream, Loader=Loader):
     loader = Loader(stream)
     try:
         while loader.check_token():
-            yield loader.get_token()
+            yield _materialize_marks(loader, loader.get_token())
     finally:
         loader.dispose()
 
@@ -34,7 +65,7 @@ def parse(stream, Loader=Loader):
     loader = Loader(stream)
     try:
         while loader.check_event():
-            yield loader.get_event()
+            yield _materialize_marks(loader, loader.get_event())
     finally:
         loader.dispose()
 
@@ -45,7 +76,7 @@ def compose(stream, Loader=Loader):
     """
     loader = Loader(stream)
     try:
-        return loader.get_single_node()
+        return _materialize_node_marks(loader, loader.get_single_node())
     finally:
         loader.dispose()
 
@@ -57,7 +88,7 @@ def compose_all(stream, Loader=Loader):
     loader = Loader(stream)
     try:
         while loader.check_node():
-            yield loader.get_node()
+            yield _materialize_node_marks(loader, loader.get_node())
     finally:
         loader.dispose()
 
@@ -100,6 +131,19 @@ def safe_load_all(stream):
     """
     return load_all(stream, SafeLoader)
 
+def extract(stream, paths, Loader=Loader):
+    """
+    Parse the first YAML document in a stream
+    and produce the corresponding Python object,
+    keeping only the mapping keys on the given paths.
+    A path is a string key or a tuple of nested string keys.
+    """
+    loader = Loader(stream)
+    try:
+        return loader.get_single_data(paths)
+    finally:
+        loader.dispose()
+
 def emit(events, stream=None, Dumper=Dumper,
         canonical=None, indent=None, width=None,
         allow_unicode=None, line_break=None):
@@ -126,7 +170,7 @@ def serialize_all(nodes, stream=None, Dumper=Dumper,
         canonical=None, indent=None, width=None,
         allow_unicode=None, line_break=None,
         encoding='utf-8', explicit_start=None, explicit_end=None,
-        version=None, tags=None):
+        version=None, tags=None, no_aliases=None):
     """
     Serialize a sequence of representation trees into a YAML stream.
     If stream is None, return the produced string instead.
@@ -142,7 +186,8 @@ def serialize_all(nodes, stream=None, Dumper=Dumper,
     dumper = Dumper(stream, canonical=canonical, indent=indent, width=width,
             allow_unicode=allow_unicode, line_break=line_break,
             encoding=encoding, version=version, tags=tags,
-            explicit_start=explicit_start, explicit_end=explicit_end)
+            explicit_start=explicit_start, explicit_end=explicit_end,
+            no_aliases=no_aliases)
     try:
         dumper.open()
         for node in nodes:
@@ -165,7 +210,7 @@ def dump_all(documents, stream=None, Dumper=Dumper,
         canonical=None, indent=None, width=None,
         allow_unicode=None, line_break=None,
         encoding='utf-8', explicit_start=None, explicit_end=None,
-        version=None, tags=None):
+        version=None, tags=None, no_aliases=None):
     """
     Serialize a sequence of Python objects into a YAML stream.
     If stream is None, return the produced string instead.
@@ -183,7 +228,8 @@ def dump_all(documents, stream=None, Dumper=Dumper,
             canonical=canonical, indent=indent, width=width,
             allow_unicode=allow_unicode, line_break=line_break,
             encoding=encoding, version=version, tags=tags,
-            explicit_start=explicit_start, explicit_end=explicit_end)
+            explicit_start=explicit_start, explicit_end=explicit_end,
+            no_aliases=no_aliases)
     try:
         dumper.open()
         for data in documents:
@@ -21,38 +21,48 @@ class Composer(object):
         # If there are more documents available?
         return not self.check_event(StreamEndEvent)
 
-    def get_node(self):
+    def get_node(self, paths=None):
         # Get the root node of the next document.
         if not self.check_event(StreamEndEvent):
-            return self.compose_document()
+            return self.compose_document(paths)
 
-    def get_single_node(self):
+    def get_single_node(self, paths=None):
         # Drop the STREAM-START event.
         self.get_event()
 
         # Compose a document if the stream is not empty.
         document = None
         if not self.check_event(StreamEndEvent):
-            document = self.compose_document()
+            document = self.compose_document(paths)
 
         # Ensure that the stream contains no more documents.
         if not self.check_event(StreamEndEvent):
             event = self.get_event()
-            raise ComposerError("expected a single document in the stream",
+            error = ComposerError("expected a single document in the stream",
                     document.start_mark, "but found another document",
                     event.start_mark)
+            error.materialize_marks(self)
+            raise error
 
         # Drop the STREAM-END event.
         self.get_event()
 
         return document
 
-    def compose_document(self):
+    def compose_document(self, paths=None):
         # Drop the DOCUMENT-START event.
         self.get_event()
 
         # Compose the root node.
-        node = self.compose_node(None, None)
+        try:
+            if paths is None:
+                node = self.compose_node(None, None)
+            else:
+                node = self.compose_selected_node(None, None,
+                        self.compile_paths(paths))
+        except MarkedYAMLError, exc:
+            exc.materialize_marks(self)
+            raise
 
         # Drop the DOCUMENT-END event.
         self.get_event()
@@ -137,3 +147,96 @@ class Composer(object):
         node.end_mark = end_event.end_mark
         return node
 
+
+    # Composing only selected mapping keys.
+    #
+    # A path is a mapping key or a tuple of nested mapping keys.  Mappings on
+    # the way to a selected key only get the selected items, and the events
+    # of everything else are dropped without building nodes.
+    #
+    # Keys are matched against plain string keys in the document, before
+    # construction, so only string keys can be selected.
+
+    def compile_paths(self, paths):
+        # Turn the paths into a tree of dicts; None selects the whole value.
+        selection = {}
+        for path in paths:
+            if isinstance(path, basestring):
+                path = (path,)
+            if not isinstance(path, (tuple, list)) or not path:
+                raise ComposerError("Invalid path: %r" % (path,))
+            for key in path:
+                if not isinstance(key, basestring):
+                    raise ComposerError("Invalid path key: %r; only string"
+                            " keys can be selected" % (key,))
+            level = selection
+            for key in path[:-1]:
+                if key in level and level[key] is None:
+                    break
+                level = level.setdefault(unicode(key), {})
+            else:
+                level[unicode(path[-1])] = None
+        return selection
+
+    def compose_selected_node(self, parent, index, selection):
+        event = self.peek_event()
+        if not isinstance(event, MappingStartEvent) or event.anchor is not None:
+            # The root is kept whatever it is, as well as anchored mappings
+            # that aliases may refer to; other values cannot hold the keys.
+            if parent is None or event.anchor is not None:
+                return self.compose_node(parent, index)
+            self.skip_node(parent, index)
+            return None
+        self.descend_resolver(parent, index)
+        start_event = self.get_event()
+        tag = start_event.tag
+        if tag is None or tag == u'!':
+            tag = self.resolve(MappingNode, None, start_event.implicit)
+        node = MappingNode(tag, [],
+                start_event.start_mark, None,
+                flow_style=start_event.flow_style)
+        while not self.check_event(MappingEndEvent):
+            item_key = self.compose_node(node, None)
+            if item_key.tag == u'tag:yaml.org,2002:merge':
+                # Merged mappings are kept whole.
+                item_value = self.compose_node(node, item_key)
+            elif isinstance(item_key, ScalarNode)  \
+                    and item_key.tag == u'tag:yaml.org,2002:str' \
+                    and item_key.value in selection:
+                subselection = selection[item_key.value]
+                if subselection is None:
+                    item_value = self.compose_node(node, item_key)
+                else:
+                    item_value = self.compose_selected_node(node, item_key,
+                            subselection)
+                    if item_value is None:
+                        continue
+            else:
+                self.skip_node(node, item_key)
+                continue
+            node.value.append((item_key, item_value))
+        end_event = self.get_event()
+        node.end_mark = end_event.end_mark
+        self.ascend_resolver()
+        return node
+
+    def skip_node(self, parent, index):
+        # Drop the events of a node.  Aliases and anchored nodes still go
+        # through compose_node to keep the anchor table right, and so does
+        # everything when path resolvers need to see the parent nodes.
+        if self.peek_event().anchor is not None or self.yaml_path_resolvers:
+            self.compose_node(parent, index)
+            return
+        depth = 0
+        while True:
+            event = self.peek_event()
+            if isinstance(event, NodeEvent) and event.anchor is not None:
+                self.compose_node(None, None)
+                continue
+            self.get_event()
+            if isinstance(event, CollectionStartEvent):
+                depth += 1
+            elif isinstance(event, CollectionEndEvent):
+                depth -= 1
+            if not depth:
+                break
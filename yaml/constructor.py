@@ -27,26 +27,30 @@ class BaseConstructor(object):
         # If there are more documents available?
         return self.check_node()
 
-    def get_data(self):
+    def get_data(self, paths=None):
         # Construct and return the next document.
         if self.check_node():
-            return self.construct_document(self.get_node())
+            return self.construct_document(self.get_node(paths))
 
-    def get_single_data(self):
+    def get_single_data(self, paths=None):
         # Ensure that the stream contains a single document and construct it.
-        node = self.get_single_node()
+        node = self.get_single_node(paths)
         if node is not None:
             return self.construct_document(node)
         return None
 
     def construct_document(self, node):
-        data = self.construct_object(node)
-        while self.state_generators:
-            state_generators = self.state_generators
-            self.state_generators = []
-            for generator in state_generators:
-                for dummy in generator:
-                    pass
+        try:
+            data = self.construct_object(node)
+            while self.state_generators:
+                state_generators = self.state_generators
+                self.state_generators = []
+                for generator in state_generators:
+                    for dummy in generator:
+                        pass
+        except MarkedYAMLError, exc:
+            exc.materialize_marks(self)
+            raise
         self.constructed_objects = {}
         self.recursive_objects = {}
         self.deep_construct = False
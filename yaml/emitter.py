@@ -11,6 +11,11 @@ __all__ = ['Emitter', 'EmitterError']
 from error import YAMLError
 from events import *
 
+from collections import deque
+from itertools import islice
+
+import re
+
 class EmitterError(YAMLError):
     pass
 
@@ -35,6 +40,14 @@ class Emitter(object):
         u'tag:yaml.org,2002:' : u'!!',
     }
 
+    # The number of pieces of output collected before they are written.
+    BUFFER_SIZE = 4096
+
+    # Printable ASCII scalars without indicators, leading or trailing spaces
+    # allow every style; `analyze_scalar` does not need to look at them.
+    SIMPLE_SCALAR = re.compile(u'[0-9A-Za-z_/()+=$^~;<\\\\]'
+            u'(?:[-0-9A-Za-z_./()+=$^~;<\\\\@ ]*[-0-9A-Za-z_./()+=$^~;<\\\\@])?\\Z')
+
     def __init__(self, stream, canonical=None, indent=None, width=None,
             allow_unicode=None, line_break=None):
 
@@ -44,13 +57,17 @@ class Emitter(object):
         # Encoding can be overriden by STREAM-START.
         self.encoding = None
 
+        # Output is collected in a buffer and written to the stream in
+        # large pieces.
+        self.buffer = []
+
         # Emitter is a state machine with a stack of states to handle nested
         # structures.
         self.states = []
         self.state = self.expect_stream_start
 
         # Current event and the event queue.
-        self.events = []
+        self.events = deque()
         self.event = None
 
         # The current indentation level and the stack of previous indents.
@@ -111,7 +128,7 @@ class Emitter(object):
     def emit(self, event):
         self.events.append(event)
         while not self.need_more_events():
-            self.event = self.events.pop(0)
+            self.event = self.events.popleft()
             self.state()
             self.event = None
 
@@ -132,7 +149,7 @@ class Emitter(object):
 
     def need_events(self, count):
         level = 0
-        for event in self.events[1:]:
+        for event in islice(self.events, 1, None):
             if isinstance(event, (DocumentStartEvent, CollectionStartEvent)):
                 level += 1
             elif isinstance(event, (DocumentEndEvent, CollectionEndEvent)):
@@ -635,6 +652,13 @@ class Emitter(object):
                     allow_single_quoted=True, allow_double_quoted=True,
                     allow_block=False)
 
+        # So are simple scalars.
+        if self.SIMPLE_SCALAR.match(scalar):
+            return ScalarAnalysis(scalar=scalar, empty=False, multiline=False,
+                    allow_flow_plain=True, allow_block_plain=True,
+                    allow_single_quoted=True, allow_double_quoted=True,
+                    allow_block=True)
+
         # Indicators and special characters.
         block_indicators = False
         flow_indicators = False
@@ -787,14 +811,29 @@ class Emitter(object):
 
     # Writers.
 
+    def flush_buffer(self):
+        if not self.buffer:
+            return
+        if not self.encoding:
+            data = u''.join(self.buffer)
+        elif u''.encode(self.encoding):
+            # Encoders like 'utf-16' prefix every piece with a BOM.
+            data = ''.join([piece.encode(self.encoding)
+                    for piece in self.buffer])
+        else:
+            data = u''.join(self.buffer).encode(self.encoding)
+        self.buffer = []
+        self.stream.write(data)
+
     def flush_stream(self):
+        self.flush_buffer()
         if hasattr(self.stream, 'flush'):
             self.stream.flush()
 
     def write_stream_start(self):
         # Write BOM if needed.
         if self.encoding and self.encoding.startswith('utf-16'):
-            self.stream.write(u'\uFEFF'.encode(self.encoding))
+            self.buffer.append(u'\uFEFF')
 
     def write_stream_end(self):
         self.flush_stream()
@@ -809,9 +848,7 @@ class Emitter(object):
         self.indention = self.indention and indention
         self.column += len(data)
         self.open_ended = False
-        if self.encoding:
-            data = data.encode(self.encoding)
-        self.stream.write(data)
+        self.buffer.append(data)
 
     def write_indent(self):
         indent = self.indent or 0
@@ -822,9 +859,7 @@ class Emitter(object):
             self.whitespace = True
             data = u' '*(indent-self.column)
             self.column = indent
-            if self.encoding:
-                data = data.encode(self.encoding)
-            self.stream.write(data)
+            self.buffer.append(data)
 
     def write_line_break(self, data=None):
         if data is None:
@@ -833,22 +868,18 @@ class Emitter(object):
         self.indention = True
         self.line += 1
         self.column = 0
-        if self.encoding:
-            data = data.encode(self.encoding)
-        self.stream.write(data)
+        self.buffer.append(data)
+        if len(self.buffer) >= self.BUFFER_SIZE:
+            self.flush_buffer()
 
     def write_version_directive(self, version_text):
         data = u'%%YAML %s' % version_text
-        if self.encoding:
-            data = data.encode(self.encoding)
-        self.stream.write(data)
+        self.buffer.append(data)
         self.write_line_break()
 
     def write_tag_directive(self, handle_text, prefix_text):
         data = u'%%TAG %s %s' % (handle_text, prefix_text)
-        if self.encoding:
-            data = data.encode(self.encoding)
-        self.stream.write(data)
+        self.buffer.append(data)
         self.write_line_break()
 
     # Scalar streams.
@@ -870,9 +901,7 @@ class Emitter(object):
                     else:
                         data = text[start:end]
                         self.column += len(data)
-                        if self.encoding:
-                            data = data.encode(self.encoding)
-                        self.stream.write(data)
+                        self.buffer.append(data)
                     start = end
             elif breaks:
                 if ch is None or ch not in u'\n\x85\u2028\u2029':
@@ -890,16 +919,12 @@ class Emitter(object):
                     if start < end:
                         data = text[start:end]
                         self.column += len(data)
-                        if self.encoding:
-                            data = data.encode(self.encoding)
-                        self.stream.write(data)
+                        self.buffer.append(data)
                         start = end
             if ch == u'\'':
                 data = u'\'\''
                 self.column += 2
-                if self.encoding:
-                    data = data.encode(self.encoding)
-                self.stream.write(data)
+                self.buffer.append(data)
                 start = end + 1
             if ch is not None:
                 spaces = (ch == u' ')
@@ -940,9 +965,7 @@ class Emitter(object):
                 if start < end:
                     data = text[start:end]
                     self.column += len(data)
-                    if self.encoding:
-                        data = data.encode(self.encoding)
-                    self.stream.write(data)
+                    self.buffer.append(data)
                     start = end
                 if ch is not None:
                     if ch in self.ESCAPE_REPLACEMENTS:
@@ -954,9 +977,7 @@ class Emitter(object):
                     else:
                         data = u'\\U%08X' % ord(ch)
                     self.column += len(data)
-                    if self.encoding:
-                        data = data.encode(self.encoding)
-                    self.stream.write(data)
+                    self.buffer.append(data)
                     start = end+1
             if 0 < end < len(text)-1 and (ch == u' ' or start >= end)   \
                     and self.column+(end-start) > self.best_width and split:
@@ -964,18 +985,14 @@ class Emitter(object):
                 if start < end:
                     start = end
                 self.column += len(data)
-                if self.encoding:
-                    data = data.encode(self.encoding)
-                self.stream.write(data)
+                self.buffer.append(data)
                 self.write_indent()
                 self.whitespace = False
                 self.indention = False
                 if text[start] == u' ':
                     data = u'\\'
                     self.column += len(data)
-                    if self.encoding:
-                        data = data.encode(self.encoding)
-                    self.stream.write(data)
+                    self.buffer.append(data)
             end += 1
         self.write_indicator(u'"', False)
 
@@ -1025,17 +1042,13 @@ class Emitter(object):
                     else:
                         data = text[start:end]
                         self.column += len(data)
-                        if self.encoding:
-                            data = data.encode(self.encoding)
-                        self.stream.write(data)
+                        self.buffer.append(data)
                     start = end
             else:
                 if ch is None or ch in u' \n\x85\u2028\u2029':
                     data = text[start:end]
                     self.column += len(data)
-                    if self.encoding:
-                        data = data.encode(self.encoding)
-                    self.stream.write(data)
+                    self.buffer.append(data)
                     if ch is None:
                         self.write_line_break()
                     start = end
@@ -1069,9 +1082,7 @@ class Emitter(object):
             else:
                 if ch is None or ch in u'\n\x85\u2028\u2029':
                     data = text[start:end]
-                    if self.encoding:
-                        data = data.encode(self.encoding)
-                    self.stream.write(data)
+                    self.buffer.append(data)
                     if ch is None:
                         self.write_line_break()
                     start = end
@@ -1087,9 +1098,7 @@ class Emitter(object):
         if not self.whitespace:
             data = u' '
             self.column += len(data)
-            if self.encoding:
-                data = data.encode(self.encoding)
-            self.stream.write(data)
+            self.buffer.append(data)
         self.whitespace = False
         self.indention = False
         spaces = False
@@ -1108,9 +1117,7 @@ class Emitter(object):
                     else:
                         data = text[start:end]
                         self.column += len(data)
-                        if self.encoding:
-                            data = data.encode(self.encoding)
-                        self.stream.write(data)
+                        self.buffer.append(data)
                     start = end
             elif breaks:
                 if ch not in u'\n\x85\u2028\u2029':
@@ -1129,9 +1136,7 @@ class Emitter(object):
                 if ch is None or ch in u' \n\x85\u2028\u2029':
                     data = text[start:end]
                     self.column += len(data)
-                    if self.encoding:
-                        data = data.encode(self.encoding)
-                    self.stream.write(data)
+                    self.buffer.append(data)
                     start = end
             if ch is not None:
                 spaces = (ch == u' ')
@@ -55,6 +55,13 @@ class MarkedYAMLError(YAMLError):
         self.problem_mark = problem_mark
         self.note = note
 
+    def materialize_marks(self, reader):
+        # Marks that are still offsets into the reader's buffer.
+        if isinstance(self.context_mark, int):
+            self.context_mark = reader.get_mark(self.context_mark)
+        if isinstance(self.problem_mark, int):
+            self.problem_mark = reader.get_mark(self.problem_mark)
+
     def __str__(self):
         lines = []
         if self.context is not None:
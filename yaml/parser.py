@@ -95,7 +95,11 @@ class Parser(object):
         # Check the type of the next event.
         if self.current_event is None:
             if self.state:
-                self.current_event = self.state()
+                try:
+                    self.current_event = self.state()
+                except MarkedYAMLError, exc:
+                    exc.materialize_marks(self)
+                    raise
         if self.current_event is not None:
             if not choices:
                 return True
@@ -108,14 +112,22 @@ class Parser(object):
         # Get the next event.
         if self.current_event is None:
             if self.state:
-                self.current_event = self.state()
+                try:
+                    self.current_event = self.state()
+                except MarkedYAMLError, exc:
+                    exc.materialize_marks(self)
+                    raise
         return self.current_event
 
     def get_event(self):
         # Get the next event and proceed further.
         if self.current_event is None:
             if self.state:
-                self.current_event = self.state()
+                try:
+                    self.current_event = self.state()
+                except MarkedYAMLError, exc:
+                    exc.materialize_marks(self)
+                    raise
         value = self.current_event
         self.current_event = None
         return value
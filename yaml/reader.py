@@ -5,7 +5,9 @@
 #
 #   Mark(source, line, column)
 # It's just a record and its only use is producing nice error messages.
-# Parser does not use it for any other purposes.
+# Parser does not use it for any other purposes.  Tokens, events and nodes
+# store the offset of the mark in the buffer, and a Mark is only made when an
+# error is raised or `reader.get_mark(offset)` is called.
 #
 #   Reader(source, data)
 # Reader determines the encoding of `data` and converts it to unicode.
@@ -14,12 +16,14 @@
 #   reader.forward(length=1) - move the current position to `length` characters.
 #   reader.index - the number of the current character.
 #   reader.line, stream.column - the line and the column of the current character.
+#   reader.buffer, reader.pointer - the whole decoded input, ending with '\0',
+#       and the index of the current character in it.
 
 __all__ = ['Reader', 'ReaderError']
 
 from error import YAMLError, Mark
 
-import codecs, re
+import codecs, re, bisect
 
 class ReaderError(YAMLError):
 
@@ -54,134 +58,111 @@ class Reader(object):
     #  - a file-like object with its `read` method returning `str`,
     #  - a file-like object with its `read` method returning `unicode`.
 
-    # Yeah, it's ugly and slow.
+    # The whole input is read and decoded at once, so moving the pointer is
+    # just an addition.  `line` and `column` are computed when they are asked
+    # for, from the offsets where the lines start.
 
     def __init__(self, stream):
         self.name = None
         self.stream = None
-        self.stream_pointer = 0
-        self.eof = True
         self.buffer = u''
         self.pointer = 0
-        self.raw_buffer = None
-        self.raw_decode = None
         self.encoding = None
-        self.index = 0
-        self.line = 0
-        self.column = 0
+        self.line_starts = None
         if isinstance(stream, unicode):
             self.name = "<unicode string>"
-            self.check_printable(stream)
-            self.buffer = stream+u'\0'
+            data = stream
         elif isinstance(stream, str):
             self.name = "<string>"
-            self.raw_buffer = stream
-            self.determine_encoding()
+            data = self.decode(stream)
         else:
             self.stream = stream
             self.name = getattr(stream, 'name', "<file>")
-            self.eof = False
-            self.raw_buffer = ''
-            self.determine_encoding()
+            data = stream.read()
+            if not isinstance(data, unicode):
+                data = self.decode(data)
+        self.check_printable(data)
+        self.buffer = data+u'\0'
+        self.has_bom = u'\uFEFF' in data
+        self.current_line = 0
+        self.line_start = self.line_end = 0
 
     def peek(self, index=0):
-        try:
-            return self.buffer[self.pointer+index]
-        except IndexError:
-            self.update(index+1)
-            return self.buffer[self.pointer+index]
+        return self.buffer[self.pointer+index]
 
     def prefix(self, length=1):
-        if self.pointer+length >= len(self.buffer):
-            self.update(length)
         return self.buffer[self.pointer:self.pointer+length]
 
     def forward(self, length=1):
-        if self.pointer+length+1 >= len(self.buffer):
-            self.update(length+1)
-        while length:
-            ch = self.buffer[self.pointer]
-            self.pointer += 1
-            self.index += 1
-            if ch in u'\n\x85\u2028\u2029'  \
-                    or (ch == u'\r' and self.buffer[self.pointer] != u'\n'):
-                self.line += 1
-                self.column = 0
-            elif ch != u'\uFEFF':
-                self.column += 1
-            length -= 1
-
-    def get_mark(self):
+        self.pointer += length
+
+    # Every character of the buffer is read, so `index` is the pointer.
+    index = property(lambda self: self.pointer)
+
+    LINE_BREAK = re.compile(u'[\n\x85\u2028\u2029]|\r(?!\n)')
+    def find_line(self, pointer):
+        # Makes the line containing `pointer` the current line.
+        if self.line_starts is None:
+            self.line_starts = [0]+[match.end()
+                    for match in self.LINE_BREAK.finditer(self.buffer)]
+            self.line_starts.append(len(self.buffer)+1)
+        line = bisect.bisect_right(self.line_starts, pointer)-1
+        self.current_line = line
+        self.line_start = self.line_starts[line]
+        self.line_end = self.line_starts[line+1]
+
+    def get_position(self, pointer):
+        if not self.line_start <= pointer < self.line_end:
+            self.find_line(pointer)
+        column = pointer-self.line_start
+        if self.has_bom:
+            # The byte order mark does not take a column.
+            column -= self.buffer.count(u'\uFEFF', self.line_start, pointer)
+        return self.current_line, column
+
+    line = property(lambda self: self.get_position(self.pointer)[0])
+    column = property(lambda self: self.get_position(self.pointer)[1])
+
+    def get_mark(self, pointer=None):
+        # Tokens, events and nodes keep their marks as offsets into the
+        # buffer; `get_mark(offset)` turns such an offset into a `Mark`.
+        if pointer is None:
+            pointer = self.pointer
+        line, column = self.get_position(pointer)
         if self.stream is None:
-            return Mark(self.name, self.index, self.line, self.column,
-                    self.buffer, self.pointer)
+            return Mark(self.name, pointer, line, column,
+                    self.buffer, pointer)
         else:
-            return Mark(self.name, self.index, self.line, self.column,
+            return Mark(self.name, pointer, line, column,
                     None, None)
 
-    def determine_encoding(self):
-        while not self.eof and len(self.raw_buffer) < 2:
-            self.update_raw()
-        if not isinstance(self.raw_buffer, unicode):
-            if self.raw_buffer.startswith(codecs.BOM_UTF16_LE):
-                self.raw_decode = codecs.utf_16_le_decode
-                self.encoding = 'utf-16-le'
-            elif self.raw_buffer.startswith(codecs.BOM_UTF16_BE):
-                self.raw_decode = codecs.utf_16_be_decode
-                self.encoding = 'utf-16-be'
-            else:
-                self.raw_decode = codecs.utf_8_decode
-                self.encoding = 'utf-8'
-        self.update(1)
+    def decode(self, data):
+        if data.startswith(codecs.BOM_UTF16_LE):
+            decode = codecs.utf_16_le_decode
+            self.encoding = 'utf-16-le'
+        elif data.startswith(codecs.BOM_UTF16_BE):
+            decode = codecs.utf_16_be_decode
+            self.encoding = 'utf-16-be'
+        else:
+            decode = codecs.utf_8_decode
+            self.encoding = 'utf-8'
+        try:
+            data, converted = decode(data, 'strict', True)
+        except UnicodeDecodeError, exc:
+            character = exc.object[exc.start]
+            raise ReaderError(self.name, exc.start, character,
+                    exc.encoding, exc.reason)
+        return data
 
     NON_PRINTABLE = re.compile(u'[^\x09\x0A\x0D\x20-\x7E\x85\xA0-\uD7FF\uE000-\uFFFD]')
     def check_printable(self, data):
         match = self.NON_PRINTABLE.search(data)
         if match:
             character = match.group()
-            position = self.index+(len(self.buffer)-self.pointer)+match.start()
+            position = match.start()
             raise ReaderError(self.name, position, ord(character),
                     'unicode', "special characters are not allowed")
 
-    def update(self, length):
-        if self.raw_buffer is None:
-            return
-        self.buffer = self.buffer[self.pointer:]
-        self.pointer = 0
-        while len(self.buffer) < length:
-            if not self.eof:
-                self.update_raw()
-            if self.raw_decode is not None:
-                try:
-                    data, converted = self.raw_decode(self.raw_buffer,
-                            'strict', self.eof)
-                except UnicodeDecodeError, exc:
-                    character = exc.object[exc.start]
-                    if self.stream is not None:
-                        position = self.stream_pointer-len(self.raw_buffer)+exc.start
-                    else:
-                        position = exc.start
-                    raise ReaderError(self.name, position, character,
-                            exc.encoding, exc.reason)
-            else:
-                data = self.raw_buffer
-                converted = len(data)
-            self.check_printable(data)
-            self.buffer += data
-            self.raw_buffer = self.raw_buffer[converted:]
-            if self.eof:
-                self.buffer += u'\0'
-                self.raw_buffer = None
-                break
-
-    def update_raw(self, size=1024):
-        data = self.stream.read(size)
-        if data:
-            self.raw_buffer += data
-            self.stream_pointer += len(data)
-        else:
-            self.eof = True
-
 #try:
 #    import psyco
 #    psyco.bind(Reader)
@@ -17,9 +17,11 @@ class BaseRepresenter(object):
     yaml_representers = {}
     yaml_multi_representers = {}
 
-    def __init__(self, default_style=None, default_flow_style=None):
+    def __init__(self, default_style=None, default_flow_style=None,
+            no_aliases=None):
         self.default_style = default_style
         self.default_flow_style = default_flow_style
+        self.no_aliases = no_aliases
         self.represented_objects = {}
         self.object_keeper = []
         self.alias_key = None
@@ -42,14 +44,22 @@ class BaseRepresenter(object):
             self.alias_key = None
         else:
             self.alias_key = id(data)
+        open_key = None
         if self.alias_key is not None:
             if self.alias_key in self.represented_objects:
                 node = self.represented_objects[self.alias_key]
-                #if node is None:
-                #    raise RepresenterError("recursive objects are not allowed: %r" % data)
+                if node is None:
+                    raise RepresenterError("recursive objects are not allowed: %r" % data)
                 return node
-            #self.represented_objects[alias_key] = None
-            self.object_keeper.append(data)
+            if self.no_aliases:
+                # Without aliases, an object is only remembered while its
+                # contents are represented; shared objects are represented
+                # again each time.
+                open_key = self.alias_key
+                self.represented_objects[open_key] = None
+                self.alias_key = None
+            else:
+                self.object_keeper.append(data)
         data_types = type(data).__mro__
         if type(data) is types.InstanceType:
             data_types = self.get_classobj_bases(data.__class__)+list(data_types)
@@ -67,8 +77,8 @@ class BaseRepresenter(object):
                     node = self.yaml_representers[None](self, data)
                 else:
                     node = ScalarNode(None, unicode(data))
-        #if alias_key is not None:
-        #    self.represented_objects[alias_key] = node
+        if open_key is not None:
+            del self.represented_objects[open_key]
         return node
 
     def add_representer(cls, data_type, representer):
@@ -9,6 +9,75 @@ import re
 class ResolverError(YAMLError):
     pass
 
+# Backreferences are numbered from the start of the whole pattern, so a
+# regexp that uses them cannot be combined with other regexps.
+BACKREFERENCE = re.compile(r'\\[1-9]|\(\?P=')
+
+class ImplicitResolverTable(object):
+
+    # Maps scalar values to their implicit tags.  Each first character of a
+    # value has its own regexp, which combines the regexps of all implicit
+    # resolvers for that character into a single alternation.  Resolved
+    # values are memoized in two generations of at most `memo_size` entries:
+    # when the recent generation is full, it replaces the old one, which is
+    # dropped.  Values still in use are copied back into the recent one.
+
+    def __init__(self, resolvers, memo_size):
+        self.resolvers = resolvers
+        common = resolvers.get(None, [])
+        self.matchers = {}
+        for ch in resolvers:
+            if ch is not None:
+                self.matchers[ch] = self.compile(resolvers[ch]+common)
+        self.default_matcher = self.compile(common)
+        self.memo_size = memo_size
+        self.recent = {}
+        self.old = {}
+
+    def compile(self, resolvers):
+        if not resolvers:
+            return lambda value: None
+        flags = resolvers[0][1].flags
+        for tag, regexp in resolvers:
+            if regexp.flags != flags or BACKREFERENCE.search(regexp.pattern):
+                return self.compile_chain(resolvers)
+        tags = [None]
+        patterns = []
+        for tag, regexp in resolvers:
+            # The group wrapping a regexp closes after any group inside it, so
+            # it is the `lastindex` of a match of that regexp.
+            tags.append(tag)
+            tags.extend([None]*regexp.groups)
+            patterns.append(u'(%s)' % regexp.pattern)
+        combined = re.compile(u'|'.join(patterns), flags)
+        def match(value):
+            found = combined.match(value)
+            if found is not None:
+                return tags[found.lastindex]
+        return match
+
+    def compile_chain(self, resolvers):
+        def match(value):
+            for tag, regexp in resolvers:
+                if regexp.match(value):
+                    return tag
+        return match
+
+    def resolve(self, value):
+        try:
+            return self.recent[value]
+        except KeyError:
+            pass
+        if value in self.old:
+            tag = self.old[value]
+        else:
+            tag = self.matchers.get(value[:1], self.default_matcher)(value)
+        if len(self.recent) >= self.memo_size:
+            self.old = self.recent
+            self.recent = {}
+        self.recent[value] = tag
+        return tag
+
 class BaseResolver(object):
 
     DEFAULT_SCALAR_TAG = u'tag:yaml.org,2002:str'
@@ -18,6 +87,14 @@ class BaseResolver(object):
     yaml_implicit_resolvers = {}
     yaml_path_resolvers = {}
 
+    # Built from `yaml_implicit_resolvers` on first use, and kept in the same
+    # class, so adding a resolver to a class never leaves a stale table in
+    # its subclasses.
+    yaml_implicit_table = None
+
+    # Number of resolved scalar values memoized per generation.
+    yaml_implicit_memo_size = 1024
+
     def __init__(self):
         self.resolver_exact_paths = []
         self.resolver_prefix_paths = []
@@ -29,8 +106,21 @@ class BaseResolver(object):
             first = [None]
         for ch in first:
             cls.yaml_implicit_resolvers.setdefault(ch, []).append((tag, regexp))
+        cls.yaml_implicit_table = None
     add_implicit_resolver = classmethod(add_implicit_resolver)
 
+    def get_implicit_resolver_table(cls):
+        for owner in cls.__mro__:
+            if 'yaml_implicit_resolvers' in owner.__dict__:
+                break
+        table = owner.__dict__.get('yaml_implicit_table')
+        if table is None    \
+                or table.resolvers is not owner.yaml_implicit_resolvers:
+            owner.yaml_implicit_table = ImplicitResolverTable(
+                    owner.yaml_implicit_resolvers, cls.yaml_implicit_memo_size)
+        return owner.yaml_implicit_table
+    get_implicit_resolver_table = classmethod(get_implicit_resolver_table)
+
     def add_path_resolver(cls, tag, path, kind=None):
         # Note: `add_path_resolver` is experimental.  The API could be changed.
         # `new_path` is a pattern that is matched against the path from the
@@ -139,14 +229,13 @@ class BaseResolver(object):
 
     def resolve(self, kind, value, implicit):
         if kind is ScalarNode and implicit[0]:
-            if value == u'':
-                resolvers = self.yaml_implicit_resolvers.get(u'', [])
-            else:
-                resolvers = self.yaml_implicit_resolvers.get(value[0], [])
-            resolvers += self.yaml_implicit_resolvers.get(None, [])
-            for tag, regexp in resolvers:
-                if regexp.match(value):
-                    return tag
+            table = self.yaml_implicit_table
+            if table is None    \
+                    or table.resolvers is not self.yaml_implicit_resolvers:
+                table = self.get_implicit_resolver_table()
+            tag = table.resolve(value)
+            if tag is not None:
+                return tag
             implicit = implicit[1]
         if self.yaml_path_resolvers:
             exact_paths = self.resolver_exact_paths[-1]
@@ -29,6 +29,10 @@ __all__ = ['Scanner', 'ScannerError']
 from error import MarkedYAMLError
 from tokens import *
 
+from collections import deque
+
+import re
+
 class ScannerError(MarkedYAMLError):
     pass
 
@@ -55,6 +59,12 @@ class Scanner(object):
         #   self.peek(i=0)       # peek the next i-th character
         #   self.prefix(l=1)     # peek the next l characters
         #   self.forward(l=1)    # read the next l characters and move the pointer.
+        # and the attributes
+        #   self.buffer          # the whole input, ending with NUL
+        #   self.pointer         # the index of the next character in buffer
+        # The scanners of scalars and of the space between tokens match the
+        # regular expressions below against `buffer` to find the length of
+        # a run of characters at once.
 
         # Had we reached the end of the stream?
         self.done = False
@@ -63,8 +73,10 @@ class Scanner(object):
         # context.
         self.flow_level = 0
 
-        # List of processed tokens that are not yet emitted.
-        self.tokens = []
+        # Queue of processed tokens that are not yet emitted. Tokens are
+        # numbered by `tokens_taken + position`; simple keys remember this
+        # number and insert KEY before it with `insert_token`.
+        self.tokens = deque()
 
         # Add the STREAM-START token.
         self.fetch_stream_start()
@@ -112,8 +124,12 @@ class Scanner(object):
 
     def check_token(self, *choices):
         # Check if the next token is one of the given types.
-        while self.need_more_tokens():
-            self.fetch_more_tokens()
+        try:
+            while self.need_more_tokens():
+                self.fetch_more_tokens()
+        except MarkedYAMLError, exc:
+            exc.materialize_marks(self)
+            raise
         if self.tokens:
             if not choices:
                 return True
@@ -124,18 +140,26 @@ class Scanner(object):
 
     def peek_token(self):
         # Return the next token, but do not delete if from the queue.
-        while self.need_more_tokens():
-            self.fetch_more_tokens()
+        try:
+            while self.need_more_tokens():
+                self.fetch_more_tokens()
+        except MarkedYAMLError, exc:
+            exc.materialize_marks(self)
+            raise
         if self.tokens:
             return self.tokens[0]
 
     def get_token(self):
         # Return the next token.
-        while self.need_more_tokens():
-            self.fetch_more_tokens()
+        try:
+            while self.need_more_tokens():
+                self.fetch_more_tokens()
+        except MarkedYAMLError, exc:
+            exc.materialize_marks(self)
+            raise
         if self.tokens:
             self.tokens_taken += 1
-            return self.tokens.pop(0)
+            return self.tokens.popleft()
 
     # Private methods.
 
@@ -150,6 +174,15 @@ class Scanner(object):
         if self.next_possible_simple_key() == self.tokens_taken:
             return True
 
+    def insert_token(self, token_number, token):
+        # Insert `token` in front of the queued token numbered `token_number`.
+        # A simple key is resolved while the key token itself is still
+        # queued, so only the few tokens after it are rotated out of the way.
+        tail = len(self.tokens)-(token_number-self.tokens_taken)
+        self.tokens.rotate(tail)
+        self.tokens.append(token)
+        self.tokens.rotate(-tail)
+
     def fetch_more_tokens(self):
 
         # Eat whitespaces and comments until we reach the next token.
@@ -307,7 +340,7 @@ class Scanner(object):
             self.remove_possible_simple_key()
             token_number = self.tokens_taken+len(self.tokens)
             key = SimpleKey(token_number, required,
-                    self.index, self.line, self.column, self.get_mark())
+                    self.index, self.line, self.column, self.pointer)
             self.possible_simple_keys[self.flow_level] = key
 
     def remove_possible_simple_key(self):
@@ -343,7 +376,7 @@ class Scanner(object):
 
         # In block context, we may need to issue the BLOCK-END tokens.
         while self.indent > column:
-            mark = self.get_mark()
+            mark = self.pointer
             self.indent = self.indents.pop()
             self.tokens.append(BlockEndToken(mark, mark))
 
@@ -362,7 +395,7 @@ class Scanner(object):
         # last token.
 
         # Read the token.
-        mark = self.get_mark()
+        mark = self.pointer
         
         # Add STREAM-START.
         self.tokens.append(StreamStartToken(mark, mark,
@@ -380,7 +413,7 @@ class Scanner(object):
         self.possible_simple_keys = {}
 
         # Read the token.
-        mark = self.get_mark()
+        mark = self.pointer
         
         # Add STREAM-END.
         self.tokens.append(StreamEndToken(mark, mark))
@@ -417,9 +450,9 @@ class Scanner(object):
         self.allow_simple_key = False
 
         # Add DOCUMENT-START or DOCUMENT-END.
-        start_mark = self.get_mark()
+        start_mark = self.pointer
         self.forward(3)
-        end_mark = self.get_mark()
+        end_mark = self.pointer
         self.tokens.append(TokenClass(start_mark, end_mark))
 
     def fetch_flow_sequence_start(self):
@@ -440,9 +473,9 @@ class Scanner(object):
         self.allow_simple_key = True
 
         # Add FLOW-SEQUENCE-START or FLOW-MAPPING-START.
-        start_mark = self.get_mark()
+        start_mark = self.pointer
         self.forward()
-        end_mark = self.get_mark()
+        end_mark = self.pointer
         self.tokens.append(TokenClass(start_mark, end_mark))
 
     def fetch_flow_sequence_end(self):
@@ -463,9 +496,9 @@ class Scanner(object):
         self.allow_simple_key = False
 
         # Add FLOW-SEQUENCE-END or FLOW-MAPPING-END.
-        start_mark = self.get_mark()
+        start_mark = self.pointer
         self.forward()
-        end_mark = self.get_mark()
+        end_mark = self.pointer
         self.tokens.append(TokenClass(start_mark, end_mark))
 
     def fetch_flow_entry(self):
@@ -477,9 +510,9 @@ class Scanner(object):
         self.remove_possible_simple_key()
 
         # Add FLOW-ENTRY.
-        start_mark = self.get_mark()
+        start_mark = self.pointer
         self.forward()
-        end_mark = self.get_mark()
+        end_mark = self.pointer
         self.tokens.append(FlowEntryToken(start_mark, end_mark))
 
     def fetch_block_entry(self):
@@ -495,7 +528,7 @@ class Scanner(object):
 
             # We may need to add BLOCK-SEQUENCE-START.
             if self.add_indent(self.column):
-                mark = self.get_mark()
+                mark = self.pointer
                 self.tokens.append(BlockSequenceStartToken(mark, mark))
 
         # It's an error for the block entry to occur in the flow context,
@@ -510,9 +543,9 @@ class Scanner(object):
         self.remove_possible_simple_key()
 
         # Add BLOCK-ENTRY.
-        start_mark = self.get_mark()
+        start_mark = self.pointer
         self.forward()
-        end_mark = self.get_mark()
+        end_mark = self.pointer
         self.tokens.append(BlockEntryToken(start_mark, end_mark))
 
     def fetch_key(self):
@@ -528,7 +561,7 @@ class Scanner(object):
 
             # We may need to add BLOCK-MAPPING-START.
             if self.add_indent(self.column):
-                mark = self.get_mark()
+                mark = self.pointer
                 self.tokens.append(BlockMappingStartToken(mark, mark))
 
         # Simple keys are allowed after '?' in the block context.
@@ -538,9 +571,9 @@ class Scanner(object):
         self.remove_possible_simple_key()
 
         # Add KEY.
-        start_mark = self.get_mark()
+        start_mark = self.pointer
         self.forward()
-        end_mark = self.get_mark()
+        end_mark = self.pointer
         self.tokens.append(KeyToken(start_mark, end_mark))
 
     def fetch_value(self):
@@ -551,14 +584,13 @@ class Scanner(object):
             # Add KEY.
             key = self.possible_simple_keys[self.flow_level]
             del self.possible_simple_keys[self.flow_level]
-            self.tokens.insert(key.token_number-self.tokens_taken,
-                    KeyToken(key.mark, key.mark))
+            self.insert_token(key.token_number, KeyToken(key.mark, key.mark))
 
             # If this key starts a new block mapping, we need to add
             # BLOCK-MAPPING-START.
             if not self.flow_level:
                 if self.add_indent(key.column):
-                    self.tokens.insert(key.token_number-self.tokens_taken,
+                    self.insert_token(key.token_number,
                             BlockMappingStartToken(key.mark, key.mark))
 
             # There cannot be two simple keys one after another.
@@ -584,7 +616,7 @@ class Scanner(object):
             # the parser.
             if not self.flow_level:
                 if self.add_indent(self.column):
-                    mark = self.get_mark()
+                    mark = self.pointer
                     self.tokens.append(BlockMappingStartToken(mark, mark))
 
             # Simple keys are allowed after ':' in the block context.
@@ -594,9 +626,9 @@ class Scanner(object):
             self.remove_possible_simple_key()
 
         # Add VALUE.
-        start_mark = self.get_mark()
+        start_mark = self.pointer
         self.forward()
-        end_mark = self.get_mark()
+        end_mark = self.pointer
         self.tokens.append(ValueToken(start_mark, end_mark))
 
     def fetch_alias(self):
@@ -750,6 +782,28 @@ class Scanner(object):
 
     # Scanners.
 
+    # Runs of characters consumed by the scanners at once.
+    SPACES = re.compile(u' *')
+    BLANKS = re.compile(u'[ \t]*')
+    NON_BREAKS = re.compile(u'[^\0\r\n\x85\u2028\u2029]*')
+    SPACES_AND_COMMENT = re.compile(u' *(?:#[^\0\r\n\x85\u2028\u2029]*)?')
+    FLOW_SCALAR_NON_SPACES = re.compile(
+            u'[^\'\"\\\\\0 \t\r\n\x85\u2028\u2029]*')
+    # In the block context, ':' ends a plain scalar only if it is followed
+    # by a space or a line break.
+    PLAIN_BLOCK = re.compile(u'[^\0 \t\r\n\x85\u2028\u2029:]*'
+            u'(?::(?![\0 \t\r\n\x85\u2028\u2029])'
+            u'[^\0 \t\r\n\x85\u2028\u2029:]*)*')
+    PLAIN_FLOW = re.compile(u'[^\0 \t\r\n\x85\u2028\u2029,:?\\[\\]{}]*')
+
+    def match_length(self, pattern, length=None):
+        # The length of the match of `pattern` at the current position, at
+        # most `length`.
+        if length is None:
+            return pattern.match(self.buffer, self.pointer).end()-self.pointer
+        return pattern.match(self.buffer, self.pointer,
+                self.pointer+length).end()-self.pointer
+
     def scan_to_next_token(self):
         # We ignore spaces, line breaks and comments.
         # If we find a line break in the block context, we set the flag
@@ -774,11 +828,7 @@ class Scanner(object):
             self.forward()
         found = False
         while not found:
-            while self.peek() == u' ':
-                self.forward()
-            if self.peek() == u'#':
-                while self.peek() not in u'\0\r\n\x85\u2028\u2029':
-                    self.forward()
+            self.forward(self.match_length(self.SPACES_AND_COMMENT))
             if self.scan_line_break():
                 if not self.flow_level:
                     self.allow_simple_key = True
@@ -787,18 +837,18 @@ class Scanner(object):
 
     def scan_directive(self):
         # See the specification for details.
-        start_mark = self.get_mark()
+        start_mark = self.pointer
         self.forward()
         name = self.scan_directive_name(start_mark)
         value = None
         if name == u'YAML':
             value = self.scan_yaml_directive_value(start_mark)
-            end_mark = self.get_mark()
+            end_mark = self.pointer
         elif name == u'TAG':
             value = self.scan_tag_directive_value(start_mark)
-            end_mark = self.get_mark()
+            end_mark = self.pointer
         else:
-            end_mark = self.get_mark()
+            end_mark = self.pointer
             while self.peek() not in u'\0\r\n\x85\u2028\u2029':
                 self.forward()
         self.scan_directive_ignored_line(start_mark)
@@ -911,7 +961,7 @@ class Scanner(object):
         # and
         #   [ *alias , "value" ]
         # Therefore we restrict aliases to numbers and ASCII letters.
-        start_mark = self.get_mark()
+        start_mark = self.pointer
         indicator = self.peek()
         if indicator == u'*':
             name = 'alias'
@@ -935,12 +985,12 @@ class Scanner(object):
             raise ScannerError("while scanning an %s" % name, start_mark,
                     "expected alphabetic or numeric character, but found %r"
                     % ch.encode('utf-8'), self.get_mark())
-        end_mark = self.get_mark()
+        end_mark = self.pointer
         return TokenClass(value, start_mark, end_mark)
 
     def scan_tag(self):
         # See the specification for details.
-        start_mark = self.get_mark()
+        start_mark = self.pointer
         ch = self.peek(1)
         if ch == u'<':
             handle = None
@@ -977,7 +1027,7 @@ class Scanner(object):
                     "expected ' ', but found %r" % ch.encode('utf-8'),
                     self.get_mark())
         value = (handle, suffix)
-        end_mark = self.get_mark()
+        end_mark = self.pointer
         return TagToken(value, start_mark, end_mark)
 
     def scan_block_scalar(self, style):
@@ -989,7 +1039,7 @@ class Scanner(object):
             folded = False
 
         chunks = []
-        start_mark = self.get_mark()
+        start_mark = self.pointer
 
         # Scan the header.
         self.forward()
@@ -1012,9 +1062,7 @@ class Scanner(object):
         while self.column == indent and self.peek() != u'\0':
             chunks.extend(breaks)
             leading_non_space = self.peek() not in u' \t'
-            length = 0
-            while self.peek(length) not in u'\0\r\n\x85\u2028\u2029':
-                length += 1
+            length = self.match_length(self.NON_BREAKS)
             chunks.append(self.prefix(length))
             self.forward(length)
             line_break = self.scan_line_break()
@@ -1098,11 +1146,7 @@ class Scanner(object):
 
     def scan_block_scalar_ignored_line(self, start_mark):
         # See the specification for details.
-        while self.peek() == u' ':
-            self.forward()
-        if self.peek() == u'#':
-            while self.peek() not in u'\0\r\n\x85\u2028\u2029':
-                self.forward()
+        self.forward(self.match_length(self.SPACES_AND_COMMENT))
         ch = self.peek()
         if ch not in u'\0\r\n\x85\u2028\u2029':
             raise ScannerError("while scanning a block scalar", start_mark,
@@ -1114,13 +1158,13 @@ class Scanner(object):
         # See the specification for details.
         chunks = []
         max_indent = 0
-        end_mark = self.get_mark()
+        end_mark = self.pointer
         while self.peek() in u' \r\n\x85\u2028\u2029':
             if self.peek() != u' ':
                 chunks.append(self.scan_line_break())
-                end_mark = self.get_mark()
+                end_mark = self.pointer
             else:
-                self.forward()
+                self.forward(self.match_length(self.SPACES))
                 if self.column > max_indent:
                     max_indent = self.column
         return chunks, max_indent, end_mark
@@ -1128,15 +1172,16 @@ class Scanner(object):
     def scan_block_scalar_breaks(self, indent):
         # See the specification for details.
         chunks = []
-        end_mark = self.get_mark()
-        while self.column < indent and self.peek() == u' ':
-            self.forward()
-        while self.peek() in u'\r\n\x85\u2028\u2029':
+        end_mark = self.pointer
+        while True:
+            # Skip the spaces up to the indentation.
+            column = self.column
+            if column < indent:
+                self.forward(self.match_length(self.SPACES, indent-column))
+            if self.peek() not in u'\r\n\x85\u2028\u2029':
+                return chunks, end_mark
             chunks.append(self.scan_line_break())
-            end_mark = self.get_mark()
-            while self.column < indent and self.peek() == u' ':
-                self.forward()
-        return chunks, end_mark
+            end_mark = self.pointer
 
     def scan_flow_scalar(self, style):
         # See the specification for details.
@@ -1150,7 +1195,7 @@ class Scanner(object):
         else:
             double = False
         chunks = []
-        start_mark = self.get_mark()
+        start_mark = self.pointer
         quote = self.peek()
         self.forward()
         chunks.extend(self.scan_flow_scalar_non_spaces(double, start_mark))
@@ -1158,7 +1203,7 @@ class Scanner(object):
             chunks.extend(self.scan_flow_scalar_spaces(double, start_mark))
             chunks.extend(self.scan_flow_scalar_non_spaces(double, start_mark))
         self.forward()
-        end_mark = self.get_mark()
+        end_mark = self.pointer
         return ScalarToken(u''.join(chunks), False, start_mark, end_mark,
                 style)
 
@@ -1192,9 +1237,7 @@ class Scanner(object):
         # See the specification for details.
         chunks = []
         while True:
-            length = 0
-            while self.peek(length) not in u'\'\"\\\0 \t\r\n\x85\u2028\u2029':
-                length += 1
+            length = self.match_length(self.FLOW_SCALAR_NON_SPACES)
             if length:
                 chunks.append(self.prefix(length))
                 self.forward(length)
@@ -1234,9 +1277,7 @@ class Scanner(object):
     def scan_flow_scalar_spaces(self, double, start_mark):
         # See the specification for details.
         chunks = []
-        length = 0
-        while self.peek(length) in u' \t':
-            length += 1
+        length = self.match_length(self.BLANKS)
         whitespaces = self.prefix(length)
         self.forward(length)
         ch = self.peek()
@@ -1266,8 +1307,7 @@ class Scanner(object):
                     and self.peek(3) in u'\0 \t\r\n\x85\u2028\u2029':
                 raise ScannerError("while scanning a quoted scalar", start_mark,
                         "found unexpected document separator", self.get_mark())
-            while self.peek() in u' \t':
-                self.forward()
+            self.forward(self.match_length(self.BLANKS))
             if self.peek() in u'\r\n\x85\u2028\u2029':
                 chunks.append(self.scan_line_break())
             else:
@@ -1280,7 +1320,7 @@ class Scanner(object):
         # We also keep track of the `allow_simple_key` flag here.
         # Indentation rules are loosed for the flow context.
         chunks = []
-        start_mark = self.get_mark()
+        start_mark = self.pointer
         end_mark = start_mark
         indent = self.indent+1
         # We allow zero indentation for scalars, but then we need to check for
@@ -1288,18 +1328,15 @@ class Scanner(object):
         #if indent == 0:
         #    indent = 1
         spaces = []
+        if self.flow_level:
+            pattern = self.PLAIN_FLOW
+        else:
+            pattern = self.PLAIN_BLOCK
         while True:
-            length = 0
             if self.peek() == u'#':
                 break
-            while True:
-                ch = self.peek(length)
-                if ch in u'\0 \t\r\n\x85\u2028\u2029'   \
-                        or (not self.flow_level and ch == u':' and
-                                self.peek(length+1) in u'\0 \t\r\n\x85\u2028\u2029') \
-                        or (self.flow_level and ch in u',:?[]{}'):
-                    break
-                length += 1
+            length = self.match_length(pattern)
+            ch = self.peek(length)
             # It's not clear what we should do with ':' in the flow context.
             if (self.flow_level and ch == u':'
                     and self.peek(length+1) not in u'\0 \t\r\n\x85\u2028\u2029,[]{}'):
@@ -1313,7 +1350,7 @@ class Scanner(object):
             chunks.extend(spaces)
             chunks.append(self.prefix(length))
             self.forward(length)
-            end_mark = self.get_mark()
+            end_mark = self.pointer
             spaces = self.scan_plain_spaces(indent, start_mark)
             if not spaces or self.peek() == u'#' \
                     or (not self.flow_level and self.column < indent):
@@ -1325,9 +1362,7 @@ class Scanner(object):
         # The specification is really confusing about tabs in plain scalars.
         # We just forbid them completely. Do not use tabs in YAML!
         chunks = []
-        length = 0
-        while self.peek(length) in u' ':
-            length += 1
+        length = self.match_length(self.SPACES)
         whitespaces = self.prefix(length)
         self.forward(length)
         ch = self.peek()
@@ -1341,7 +1376,7 @@ class Scanner(object):
             breaks = []
             while self.peek() in u' \r\n\x85\u2028\u2029':
                 if self.peek() == ' ':
-                    self.forward()
+                    self.forward(self.match_length(self.SPACES))
                 else:
                     breaks.append(self.scan_line_break())
                     prefix = self.prefix(3)
@@ -1412,7 +1447,7 @@ class Scanner(object):
     def scan_uri_escapes(self, name, start_mark):
         # See the specification for details.
         bytes = []
-        mark = self.get_mark()
+        mark = self.pointer
         while self.peek() == u'%':
             self.forward()
             for k in range(2):
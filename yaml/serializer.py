@@ -13,12 +13,14 @@ class Serializer(object):
     ANCHOR_TEMPLATE = u'id%03d'
 
     def __init__(self, encoding=None,
-            explicit_start=None, explicit_end=None, version=None, tags=None):
+            explicit_start=None, explicit_end=None, version=None, tags=None,
+            no_aliases=None):
         self.use_encoding = encoding
         self.use_explicit_start = explicit_start
         self.use_explicit_end = explicit_end
         self.use_version = version
         self.use_tags = tags
+        self.no_aliases = no_aliases
         self.serialized_nodes = {}
         self.anchors = {}
         self.last_anchor_id = 0
@@ -50,7 +52,8 @@ class Serializer(object):
             raise SerializerError("serializer is closed")
         self.emit(DocumentStartEvent(explicit=self.use_explicit_start,
             version=self.use_version, tags=self.use_tags))
-        self.anchor_node(node)
+        if not self.no_aliases:
+            self.anchor_node(node)
         self.serialize_node(node, None, None)
         self.emit(DocumentEndEvent(explicit=self.use_explicit_end))
         self.serialized_nodes = {}
@@ -76,7 +79,14 @@ class Serializer(object):
         return self.ANCHOR_TEMPLATE % self.last_anchor_id
 
     def serialize_node(self, node, parent, index):
-        alias = self.anchors[node]
+        if self.no_aliases:
+            # The nodes being serialized are the only ones remembered.
+            if node in self.serialized_nodes:
+                raise SerializerError("recursive nodes are not allowed"
+                        " without aliases")
+            alias = None
+        else:
+            alias = self.anchors[node]
         if node in self.serialized_nodes:
             self.emit(AliasEvent(alias))
         else:
@@ -108,4 +118,6 @@ class Serializer(object):
                     self.serialize_node(value, node, key)
                 self.emit(MappingEndEvent())
             self.ascend_resolver()
+            if self.no_aliases:
+                del self.serialized_nodes[node]
 